@@ -1,51 +1,138 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Dict, List, Optional
 from app.core.database import get_db
+from app.models.candidate import Candidate
+from app.models.job import ScreeningCohort, ScreeningJob
 from app.models.screening import ScreeningResult, DigitalFootprint
 from app.schemas.screening import (
     ScreeningResultResponse,
     ScreeningRequest,
     DigitalFootprintResponse,
     TextAnalysisRequest,
+    RescoreRequest,
+    RescoreResponse,
+    ScreeningJobResponse,
+    CohortScreeningRequest,
+    ScreeningCohortResponse,
 )
 from app.services.screening_service import ScreeningService
+from app.services.container import get_scoring_engine, get_screening_service, get_sentiment_analyzer
+from app.services.job_queue import cohort_progress, enqueue_cohort, enqueue_screening
 from app.services.ai.sentiment_analyzer import SentimentAnalyzer
 from app.services.ai.scoring_engine import ScoringEngine
+from app.services.scraping.async_social_media_scraper import AsyncSocialMediaScraper, get_async_scraper
 
 router = APIRouter()
 
 
-@router.post("/analyze", response_model=ScreeningResultResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/analyze", response_model=ScreeningJobResponse, status_code=status.HTTP_202_ACCEPTED)
 def start_screening_analysis(
     request: ScreeningRequest,
     db: Session = Depends(get_db)
 ):
-    screening_service = ScreeningService(db)
-    
-    try:
-        screening_result = screening_service.conduct_screening(request.candidate_id)
-        return screening_result
-    except ValueError as e:
+    # Queues the screening and returns at once; poll /jobs/{job_id} for progress
+    candidate = db.query(Candidate).filter(Candidate.id == request.candidate_id).first()
+    if not candidate:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e)
+            detail="Candidate not found"
         )
-    except Exception as e:
+
+    return enqueue_screening(db, candidate.id, {"force_refresh": request.force_refresh})
+
+
+@router.post("/cohorts", response_model=ScreeningCohortResponse, status_code=status.HTTP_202_ACCEPTED)
+def start_cohort_screening(
+    request: CohortScreeningRequest,
+    db: Session = Depends(get_db)
+):
+    if (request.candidate_ids is None) == (request.status is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either candidate_ids or status"
+        )
+
+    if request.candidate_ids is not None:
+        # Checked in slices to stay under the database's bound-parameter limit
+        requested = sorted(set(request.candidate_ids))
+        candidate_ids = []
+        for start in range(0, len(requested), 1000):
+            candidate_ids.extend(candidate_id for candidate_id, in db.query(Candidate.id).filter(
+                Candidate.id.in_(requested[start:start + 1000])
+            ).order_by(Candidate.id))
+        selection = {"candidate_ids": request.candidate_ids}
+    else:
+        candidate_ids = [candidate_id for candidate_id, in db.query(Candidate.id).filter(
+            Candidate.status == request.status
+        ).order_by(Candidate.id)]
+        selection = {"status": request.status}
+
+    if not candidate_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No candidates match the cohort selection"
+        )
+
+    cohort = enqueue_cohort(
+        db, candidate_ids,
+        payload={"force_refresh": request.force_refresh},
+        selection=selection,
+        name=request.name
+    )
+    return cohort_progress(db, cohort)
+
+
+@router.get("/cohorts/{cohort_id}", response_model=ScreeningCohortResponse)
+def get_cohort_progress(cohort_id: str, db: Session = Depends(get_db)):
+    cohort = db.query(ScreeningCohort).filter(ScreeningCohort.id == cohort_id).first()
+    if not cohort:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Screening cohort not found"
+        )
+    return cohort_progress(db, cohort)
+
+
+@router.get("/jobs", response_model=List[ScreeningJobResponse])
+def list_screening_jobs(
+    candidate_id: Optional[int] = None,
+    cohort_id: Optional[str] = None,
+    job_status: Optional[str] = Query(None, alias="status"),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    query = db.query(ScreeningJob)
+    if candidate_id is not None:
+        query = query.filter(ScreeningJob.candidate_id == candidate_id)
+    if cohort_id is not None:
+        query = query.filter(ScreeningJob.cohort_id == cohort_id)
+    if job_status:
+        query = query.filter(ScreeningJob.status == job_status)
+    return query.order_by(ScreeningJob.created_at.desc()).limit(limit).all()
+
+
+@router.get("/jobs/{job_id}", response_model=ScreeningJobResponse)
+def get_screening_job(job_id: str, db: Session = Depends(get_db)):
+    job = db.query(ScreeningJob).filter(ScreeningJob.id == job_id).first()
+    if not job:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Screening analysis failed: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Screening job not found"
         )
+    return job
 
 
 @router.post("/analyze-text")
-def analyze_texts(request: TextAnalysisRequest):
-    analyzer = SentimentAnalyzer()
-    analyses = analyzer.analyze_batch(request.texts)
+def analyze_texts(
+    request: TextAnalysisRequest,
+    analyzer: SentimentAnalyzer = Depends(get_sentiment_analyzer),
+    engine: ScoringEngine = Depends(get_scoring_engine)
+):
+    analyses = analyzer.analyze_posts(request.texts)
     aggregate = analyzer.calculate_aggregate_sentiment(analyses)
 
     # Optional: provide a lightweight scoring preview (without social signals)
-    engine = ScoringEngine()
     scoring_preview = engine.calculate_overall_score(
         sentiment_data=aggregate,
         digital_footprints=[],
@@ -54,7 +141,7 @@ def analyze_texts(request: TextAnalysisRequest):
 
     return {
         "aggregate": aggregate,
-        "items": analyses,
+        "items": [analysis.to_dict() for analysis in analyses],
         "scoring_preview": {
             "overall_score": scoring_preview.get("overall_score"),
             "digital_ethics_score": scoring_preview.get("digital_ethics_score"),
@@ -66,6 +153,46 @@ def analyze_texts(request: TextAnalysisRequest):
     }
 
 
+@router.post("/rescore", response_model=RescoreResponse)
+def rescore_screening_results(
+    request: RescoreRequest,
+    screening_service: ScreeningService = Depends(get_screening_service)
+):
+    # Applies the current ScoringEngine weights/thresholds to stored aggregates;
+    # no scraping or sentiment analysis is repeated
+    return screening_service.rescore_results(
+        batch_size=request.batch_size,
+        candidate_ids=request.candidate_ids
+    )
+
+
+def get_candidate_handles(candidate_id: int, db: Session = Depends(get_db)) -> Dict[str, Optional[str]]:
+    # Sync dependency, so FastAPI runs the query in its threadpool rather than on the event loop
+    candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
+    if not candidate:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Candidate not found"
+        )
+    return {
+        "linkedin_url": candidate.linkedin_url,
+        "twitter_username": candidate.twitter_username,
+        "facebook_url": candidate.facebook_url,
+        "instagram_username": candidate.instagram_username,
+    }
+
+
+@router.get("/{candidate_id}/profiles/live")
+async def scrape_candidate_profiles_live(
+    candidate_id: int,
+    handles: Dict[str, Optional[str]] = Depends(get_candidate_handles),
+    scraper: AsyncSocialMediaScraper = Depends(get_async_scraper)
+):
+    # Fresh, non-persisted scrape; only the scraping runs on the event loop
+    footprints = await scraper.scrape_candidate_profiles(**handles)
+    return {"candidate_id": candidate_id, "footprints": footprints}
+
+
 @router.get("/{candidate_id}/results", response_model=List[ScreeningResultResponse])
 def get_screening_results(candidate_id: int, db: Session = Depends(get_db)):
     results = db.query(ScreeningResult).filter(
@@ -1,6 +1,10 @@
-from sqlalchemy import create_engine
+from typing import Dict, List
+import io
+import json
+from datetime import date, datetime
+from sqlalchemy import create_engine, insert
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
 
 engine = create_engine(
@@ -21,3 +25,61 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def bulk_insert(db: Session, model, rows: List[Dict]) -> None:
+    """Insert plain dict rows in the session's transaction without building ORM objects.
+
+    PostgreSQL gets a single COPY (when DATABASE_BULK_COPY is on); other databases get
+    one executemany INSERT. Column defaults are applied as for ORM inserts.
+    """
+    if not rows:
+        return
+    table = model.__table__
+    if db.get_bind().dialect.name == 'postgresql' and settings.DATABASE_BULK_COPY:
+        _copy_rows(db, table, rows)
+    else:
+        db.execute(insert(table), rows)
+
+
+def _copy_rows(db: Session, table, rows: List[Dict]) -> None:
+    # Server-side defaults (the serial id) apply to columns left out of the COPY list
+    columns = [
+        column for column in table.columns
+        if any(column.name in row for row in rows) or column.default is not None
+    ]
+
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(','.join(_copy_field(row, column) for column in columns))
+        buffer.write('\n')
+    buffer.seek(0)
+
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(column.name for column in columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+
+def _copy_field(row: Dict, column) -> str:
+    if column.name in row:
+        value = row[column.name]
+    elif column.default is not None:
+        value = column.default.arg(None) if column.default.is_callable else column.default.arg
+    else:
+        value = None
+
+    # Unquoted empty is NULL in CSV COPY; every real value is quoted
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list, tuple)):
+        value = json.dumps(value)
+    elif isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    elif isinstance(value, bool):
+        value = 't' if value else 'f'
+    return '"' + str(value).replace('"', '""') + '"'
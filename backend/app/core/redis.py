@@ -0,0 +1,39 @@
+from threading import Lock
+from typing import Optional
+import logging
+import os
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_client_pid: Optional[int] = None
+_client_lock = Lock()
+
+
+def get_redis():
+    """Connected client for REDIS_URL, or None when it is unset, unreachable or redis is not installed."""
+    global _client, _client_pid
+    if not settings.REDIS_URL:
+        return None
+    with _client_lock:
+        if _client_pid != os.getpid():
+            _client = None
+            _client_pid = os.getpid()
+            try:
+                import redis
+            except ImportError:
+                logger.warning(
+                    'REDIS_URL is set but the redis package is not installed; rate limits and '
+                    'screening jobs fall back to this host (pip install redis)'
+                )
+                return None
+            try:
+                client = redis.Redis.from_url(settings.REDIS_URL)
+                client.ping()
+                _client = client
+            except Exception as e:
+                logger.warning(
+                    'Redis at REDIS_URL unreachable (%s); rate limits and screening jobs fall back to this host', e
+                )
+        return _client
@@ -1,17 +1,57 @@
+from contextlib import asynccontextmanager
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.core.database import Base, engine
 from app.api.v1 import candidates, screening, dashboard
+from app.services.ai.nlp_resources import MissingNLPResources, check_resources
+from app.services.ai.sentiment_backends import get_sentiment_backend
+from app.services.container import close_service_container, get_service_container
+from app.services.job_queue import shutdown_job_queue, sweep_stale_jobs
+
+logger = logging.getLogger(__name__)
 
 Base.metadata.create_all(bind=engine)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Disk-only check of the NLTK data the sentiment backend needs (skipped when nothing NLP
+    # is loaded at startup); in NLP_OFFLINE mode a missing resource stops startup here
+    if settings.NLP_WARM_UP_ON_STARTUP or settings.NLP_OFFLINE:
+        app.state.nlp_resources = check_resources(get_sentiment_backend().required_resources())
+        missing = app.state.nlp_resources["missing"]
+        if missing and settings.NLP_OFFLINE:
+            raise MissingNLPResources(
+                f"NLP resources missing from {settings.NLTK_DATA_DIR}: {', '.join(missing)}"
+            )
+        if missing:
+            logger.warning("NLP resources missing, they will be downloaded: %s", ", ".join(missing))
+
+    # Built and warmed once here, then injected into routes via app.services.container
+    services = get_service_container()
+    if settings.NLP_WARM_UP_ON_STARTUP:
+        services.warm_up()
+    app.state.services = services
+
+    # Jobs a previous run left queued or running would otherwise never finish
+    if settings.JOB_STALE_TIMEOUT:
+        swept = sweep_stale_jobs()
+        if any(swept.values()):
+            logger.warning("Recovered stale screening jobs: %s", swept)
+    yield
+    shutdown_job_queue()
+    close_service_container()
+
+
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     description="Sistem Analisis Jejak Digital Berbasis AI untuk Seleksi ASN yang Berintegritas",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -58,7 +98,8 @@ def health_check():
         "status": "healthy",
         "app_name": settings.APP_NAME,
         "version": settings.APP_VERSION,
-        "environment": settings.ENVIRONMENT
+        "environment": settings.ENVIRONMENT,
+        "nlp_resources": getattr(app.state, "nlp_resources", None)
     }
 
 
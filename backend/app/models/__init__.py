@@ -1,11 +1,14 @@
 from app.models.candidate import Candidate
 from app.models.screening import ScreeningResult, DigitalFootprint, SentimentAnalysis
 from app.models.user import User
+from app.models.job import ScreeningJob, ScreeningCohort
 
 __all__ = [
     "Candidate",
     "ScreeningResult",
     "DigitalFootprint",
     "SentimentAnalysis",
-    "User"
+    "User",
+    "ScreeningJob",
+    "ScreeningCohort"
 ]
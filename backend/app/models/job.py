@@ -0,0 +1,51 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Float, ForeignKey, JSON
+from datetime import datetime
+from app.core.database import Base
+
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    RETRYING = "retrying"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    ALL = (QUEUED, RUNNING, RETRYING, COMPLETED, FAILED)
+    FINISHED = (COMPLETED, FAILED)
+
+
+class ScreeningCohort(Base):
+    __tablename__ = "screening_cohorts"
+
+    id = Column(String(32), primary_key=True)
+    name = Column(String(255))
+    # {"candidate_ids": [...]} or {"status": "..."} as submitted
+    selection = Column(JSON)
+    payload = Column(JSON)
+    total_jobs = Column(Integer, default=0)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ScreeningJob(Base):
+    __tablename__ = "screening_jobs"
+
+    id = Column(String(32), primary_key=True)
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), nullable=False, index=True)
+    cohort_id = Column(String(32), ForeignKey("screening_cohorts.id"), index=True)
+    payload = Column(JSON)
+
+    status = Column(String(20), default=JobStatus.QUEUED, index=True)
+    stage = Column(String(50))
+    progress = Column(Float, default=0.0)
+
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=1)
+    error = Column(Text)
+
+    screening_result_id = Column(Integer, ForeignKey("screening_results.id"))
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
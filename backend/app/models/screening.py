@@ -28,7 +28,8 @@ class ScreeningResult(Base):
     negative_content_ratio = Column(Float)
     neutral_content_ratio = Column(Float)
     
-    recommendation = Column(SQLEnum(RecommendationStatus))
+    # Persist the enum values ('layak', ...) that the scoring engine and dashboard queries use
+    recommendation = Column(SQLEnum(RecommendationStatus, values_callable=lambda e: [m.value for m in e]))
     recommendation_reason = Column(Text)
     
     risk_flags = Column(JSON)
@@ -36,6 +37,11 @@ class ScreeningResult(Base):
     
     ai_analysis_summary = Column(Text)
     detailed_report = Column(JSON)
+
+    # Stored aggregates so scores can be recomputed without re-analysing posts
+    sentiment_data = Column(JSON)
+    engagement_insights = Column(JSON)
+    scoring_features = Column(JSON)
     
     analyzed_at = Column(DateTime, default=datetime.utcnow)
     analyzed_by = Column(String(255))
@@ -51,7 +57,7 @@ class DigitalFootprint(Base):
     __tablename__ = "digital_footprints"
 
     id = Column(Integer, primary_key=True, index=True)
-    candidate_id = Column(Integer, ForeignKey("candidates.id"), nullable=False)
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), nullable=False, index=True)
     
     platform = Column(String(50), nullable=False)
     profile_url = Column(String(500))
@@ -69,6 +75,12 @@ class DigitalFootprint(Base):
     scraped_at = Column(DateTime, default=datetime.utcnow)
     scraping_status = Column(String(50), default="completed")
     scraping_error = Column(Text)
+
+    # HTTP validators from the last fetch, for conditional revalidation
+    etag = Column(String(255))
+    last_modified = Column(String(64))
+    # SentimentAggregator state over posts_data, extended as new posts arrive
+    analysis_state = Column(JSON)
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
@@ -67,7 +67,56 @@ class ScreeningRequest(BaseModel):
     candidate_id: int
     platforms: Optional[List[str]] = ["linkedin", "twitter", "facebook"]
     deep_analysis: bool = True
+    force_refresh: bool = False  # ignore cached footprints and scrape every platform again
 
 
 class TextAnalysisRequest(BaseModel):
     texts: List[str]
+
+
+class RescoreRequest(BaseModel):
+    candidate_ids: Optional[List[int]] = None
+    batch_size: int = Field(500, ge=1, le=10000)
+
+
+class RescoreResponse(BaseModel):
+    rescored: int
+    skipped: int
+
+
+class ScreeningJobResponse(BaseModel):
+    id: str
+    candidate_id: int
+    cohort_id: Optional[str] = None
+    status: str
+    stage: Optional[str] = None
+    progress: float = 0.0
+    attempts: int = 0
+    max_attempts: int
+    error: Optional[str] = None
+    screening_result_id: Optional[int] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class CohortScreeningRequest(BaseModel):
+    # Either an explicit list of candidates or every candidate with this Candidate.status
+    candidate_ids: Optional[List[int]] = Field(None, min_length=1)
+    status: Optional[str] = None
+    name: Optional[str] = None
+    force_refresh: bool = False
+
+
+class ScreeningCohortResponse(BaseModel):
+    id: str
+    name: Optional[str] = None
+    selection: Optional[Dict[str, Any]] = None
+    total_jobs: int
+    counts: Dict[str, int]
+    progress: float
+    finished: bool
+    created_at: datetime
@@ -0,0 +1,61 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional
+import hashlib
+from app.core.config import settings
+from app.services.ai.post_analysis import PostAnalysis
+
+
+class AnalysisCache:
+    """Bounded LRU of per-post analysis results keyed by text hash + analyzer version."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, PostAnalysis]" = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def make_key(text: str, version: str) -> str:
+        return hashlib.sha1(f"{version}\0{text.strip()}".encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[PostAnalysis]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return entry
+
+    def set(self, key: str, value: PostAnalysis) -> None:
+        # Records are immutable, so entries can be shared without copying
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+analysis_cache = AnalysisCache(settings.ANALYSIS_CACHE_SIZE)
@@ -0,0 +1,116 @@
+import re
+from collections import deque
+from typing import Dict, List
+
+
+class LexiconMatcher:
+    """Aho-Corasick automaton that counts keyword hits for every lexicon in one pass."""
+
+    def __init__(self, lexicons: Dict[str, List[str]]):
+        self.categories = list(lexicons.keys())
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for index, category in enumerate(self.categories):
+            for keyword in lexicons[category]:
+                if keyword:
+                    self._insert(keyword, index)
+
+        self._build_failure_links()
+
+    def _insert(self, keyword: str, category_index: int) -> None:
+        state = 0
+        for ch in keyword:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][ch] = next_state
+            state = next_state
+        # Duplicate entries count twice, like repeated keywords in the list
+        self._out[state].append(category_index)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def count(self, text: str) -> Dict[str, int]:
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        hits = [0] * len(self.categories)
+
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for category_index in out[state]:
+                hits[category_index] += 1
+
+        return dict(zip(self.categories, hits))
+
+
+TOKEN_PATTERN = re.compile(r'\b\w+\b')
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text)
+
+
+class TokenLexiconIndex:
+    """Word-boundary lexicon lookup: O(1) per token plus a small trie for phrases."""
+
+    _TERMINAL = ''
+
+    def __init__(self, lexicons: Dict[str, List[str]]):
+        self.categories = list(lexicons.keys())
+        self._words: Dict[str, List[int]] = {}
+        self._phrases: Dict[str, Dict] = {}
+
+        for index, category in enumerate(self.categories):
+            for keyword in lexicons[category]:
+                parts = tokenize(keyword.lower())
+                if not parts:
+                    continue
+                if len(parts) == 1:
+                    self._words.setdefault(parts[0], []).append(index)
+                    continue
+                node = self._phrases
+                for part in parts:
+                    node = node.setdefault(part, {})
+                node.setdefault(self._TERMINAL, []).append(index)
+
+    def count(self, tokens: List[str]) -> Dict[str, int]:
+        words = self._words
+        phrases = self._phrases
+        terminal = self._TERMINAL
+        hits = [0] * len(self.categories)
+
+        for i, token in enumerate(tokens):
+            for category_index in words.get(token, ()):
+                hits[category_index] += 1
+
+            node = phrases.get(token)
+            j = i + 1
+            while node is not None:
+                for category_index in node.get(terminal, ()):
+                    hits[category_index] += 1
+                if j >= len(tokens):
+                    break
+                node = node.get(tokens[j])
+                j += 1
+
+        return dict(zip(self.categories, hits))
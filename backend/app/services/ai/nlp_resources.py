@@ -0,0 +1,114 @@
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+import os
+from app.core.config import settings
+
+
+class MissingNLPResources(RuntimeError):
+    pass
+
+
+_configured_dir: Optional[str] = None
+_lock = Lock()
+
+# ensure_resources outcome per (resources, data dir, offline) in this process: None once
+# they are available, else the error message, so a failed download is not retried by every analyzer
+_ensured: Dict[Tuple, Optional[str]] = {}
+_ensure_lock = Lock()
+
+
+def _package(resource: str) -> str:
+    # 'tokenizers/punkt' is downloaded as the 'punkt' package
+    return resource.rsplit('/', 1)[-1]
+
+
+def configure_data_path():
+    """Puts NLTK_DATA_DIR first on nltk's search path and returns the nltk module."""
+    global _configured_dir
+    import nltk
+
+    data_dir = os.path.abspath(settings.NLTK_DATA_DIR) if settings.NLTK_DATA_DIR else None
+    with _lock:
+        if data_dir and _configured_dir != data_dir:
+            if data_dir not in nltk.data.path:
+                nltk.data.path.insert(0, data_dir)
+            _configured_dir = data_dir
+    return nltk
+
+
+def missing_resources(resources: Optional[List[str]] = None) -> List[str]:
+    # Only looks on disk (NLTK_DATA_DIR, then nltk's default paths); never touches the network
+    resources = settings.NLTK_RESOURCES if resources is None else resources
+    if not resources:
+        return []
+    nltk = configure_data_path()
+    missing = []
+    for resource in resources:
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            missing.append(resource)
+    return missing
+
+
+def check_resources(resources: Optional[List[str]] = None) -> Dict:
+    missing = missing_resources(resources)
+    return {
+        'status': 'missing' if missing else 'ok',
+        'missing': missing,
+        'data_dir': settings.NLTK_DATA_DIR,
+        'offline': settings.NLP_OFFLINE,
+    }
+
+
+def ensure_resources(resources: Optional[List[str]] = None) -> None:
+    """Makes sure resources (default NLTK_RESOURCES) are available before they are used.
+
+    In NLP_OFFLINE mode a missing resource raises MissingNLPResources at once;
+    otherwise it is downloaded into NLTK_DATA_DIR, and raises if the download fails.
+    Either outcome is remembered for the rest of the process.
+    """
+    resources = tuple(settings.NLTK_RESOURCES if resources is None else resources)
+    if not resources:
+        return
+    key = (resources, settings.NLTK_DATA_DIR, settings.NLP_OFFLINE)
+    with _ensure_lock:
+        if key not in _ensured:
+            _ensured[key] = _ensure(list(resources))
+        error = _ensured[key]
+    if error is not None:
+        raise MissingNLPResources(error)
+
+
+def _ensure(resources: List[str]) -> Optional[str]:
+    missing = missing_resources(resources)
+    if not missing:
+        return None
+    if settings.NLP_OFFLINE:
+        return (
+            f"NLP resources missing: {', '.join(missing)}. NLP_OFFLINE is set, so they are not "
+            f"downloaded; provision them with scripts/provision_nlp_data.py"
+        )
+    missing = provision(missing)
+    if missing:
+        return (
+            f"NLP resources could not be downloaded: {', '.join(missing)}; "
+            f"provision them with scripts/provision_nlp_data.py"
+        )
+    return None
+
+
+def provision(resources: Optional[List[str]] = None, data_dir: Optional[str] = None) -> List[str]:
+    """Downloads resources into data_dir (default NLTK_DATA_DIR); returns any still missing."""
+    nltk = configure_data_path()
+    resources = settings.NLTK_RESOURCES if resources is None else resources
+    target = data_dir or settings.NLTK_DATA_DIR
+    if target:
+        os.makedirs(target, exist_ok=True)
+        if os.path.abspath(target) not in nltk.data.path:
+            nltk.data.path.insert(0, os.path.abspath(target))
+    for resource in resources:
+        nltk.download(_package(resource), download_dir=target, quiet=True)
+    # Outcomes remembered before this download no longer hold
+    _ensured.clear()
+    return missing_resources(resources)
@@ -0,0 +1,118 @@
+from threading import Lock, local
+from typing import Dict, Optional
+import json
+import os
+import sqlite3
+import time
+from app.core.config import settings
+
+
+class PersistentAnalysisCache:
+    """SQLite-backed store of per-post analysis results shared by all worker processes."""
+
+    EVICTION_INTERVAL = 1000
+    # A hit refreshes accessed_at (the eviction order) at most this often, so most reads stay reads
+    TOUCH_INTERVAL = 300
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = local()
+        self._lock = Lock()
+        self._writes_since_eviction = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS analysis_cache ('
+            ' key TEXT PRIMARY KEY,'
+            ' version TEXT NOT NULL,'
+            ' result TEXT NOT NULL,'
+            ' accessed_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_analysis_cache_accessed_at ON analysis_cache (accessed_at)')
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_analysis_cache_version ON analysis_cache (version)')
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and per process; a forked child must not reuse the parent's
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str, version: Optional[str] = None) -> Optional[Dict]:
+        conn = self._connection()
+        row = conn.execute(
+            'SELECT result, version, accessed_at FROM analysis_cache WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        result, stored_version, accessed_at = row
+        if version is not None and stored_version != version:
+            return None
+        now = time.time()
+        if now - accessed_at > self.TOUCH_INTERVAL:
+            conn.execute('UPDATE analysis_cache SET accessed_at = ? WHERE key = ?', (now, key))
+        return json.loads(result)
+
+    def set(self, key: str, version: str, result: Dict) -> None:
+        conn = self._connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO analysis_cache (key, version, result, accessed_at) VALUES (?, ?, ?, ?)',
+            (key, version, json.dumps(result), time.time())
+        )
+        with self._lock:
+            self._writes_since_eviction += 1
+            due = self._writes_since_eviction >= self.EVICTION_INTERVAL
+            if due:
+                self._writes_since_eviction = 0
+        if due:
+            self.evict(version)
+
+    def evict(self, current_version: Optional[str] = None) -> int:
+        """Drops rows of other analyzer versions, then the least recently used beyond max_entries."""
+        conn = self._connection()
+        removed = 0
+        if current_version is not None:
+            # Keys include the version, so these rows are never hit by the current analyzer
+            removed = conn.execute(
+                'DELETE FROM analysis_cache WHERE version != ?', (current_version,)
+            ).rowcount
+        count = conn.execute('SELECT COUNT(*) FROM analysis_cache').fetchone()[0]
+        excess = count - self.max_entries
+        if excess <= 0:
+            return removed
+        conn.execute(
+            'DELETE FROM analysis_cache WHERE key IN ('
+            ' SELECT key FROM analysis_cache ORDER BY accessed_at ASC LIMIT ?)',
+            (excess,)
+        )
+        return removed + excess
+
+    def count(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM analysis_cache').fetchone()[0]
+
+    def clear(self) -> None:
+        self._connection().execute('DELETE FROM analysis_cache')
+
+
+_persistent_caches: Dict[str, PersistentAnalysisCache] = {}
+_persistent_caches_lock = Lock()
+
+
+def get_persistent_cache() -> Optional[PersistentAnalysisCache]:
+    path = settings.ANALYSIS_CACHE_DB_PATH
+    if not path:
+        return None
+    with _persistent_caches_lock:
+        cache = _persistent_caches.get(path)
+        if cache is None:
+            cache = PersistentAnalysisCache(path, settings.ANALYSIS_CACHE_DB_MAX_ENTRIES)
+            _persistent_caches[path] = cache
+        return cache
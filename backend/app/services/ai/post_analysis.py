@@ -0,0 +1,54 @@
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class PostAnalysis:
+    """Immutable per-post analysis result; roughly a third of the memory of the equivalent dict.
+
+    Supports `record['field']` and `record.get('field')` so code written against
+    the dict shape keeps working; use `to_dict()` at the API boundary.
+    """
+
+    sentiment_label: str = 'neutral'
+    sentiment_score: float = 0.0
+    confidence: float = 0.0
+    contains_profanity: int = 0
+    contains_hate_speech: int = 0
+    contains_political_content: int = 0
+    keywords: Tuple[str, ...] = ()
+    contains_link: int = 0
+    caps_ratio: float = 0.0
+    exclamation_count: int = 0
+    likely_language: str = 'unknown'
+    id_stopword_ratio: float = 0.0
+    en_stopword_ratio: float = 0.0
+    toxicity_score: float = 0.0
+    spam_indicator: int = 0
+    professional_keywords_count: int = 0
+    politeness_keywords_count: int = 0
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in _FIELD_SET:
+            return default
+        return getattr(self, key)
+
+    def to_dict(self) -> Dict:
+        data = {name: getattr(self, name) for name in FIELD_NAMES}
+        data['keywords'] = list(self.keywords)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PostAnalysis':
+        values = {name: data[name] for name in FIELD_NAMES if name in data}
+        values['keywords'] = tuple(values.get('keywords') or ())
+        return cls(**values)
+
+
+FIELD_NAMES = tuple(f.name for f in fields(PostAnalysis))
+_FIELD_SET = frozenset(FIELD_NAMES)
@@ -1,6 +1,20 @@
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Union
 import numpy as np
 from app.models.screening import RecommendationStatus
+from app.services.ai.post_analysis import PostAnalysis
+
+# Per-post analyses arrive as PostAnalysis records or, from older callers, plain dicts
+ContentAnalyses = List[Union[PostAnalysis, Dict]]
+
+# Scalar per-candidate inputs consumed by score_batch, in extract_features order
+FEATURE_NAMES = (
+    'average_sentiment', 'positive_ratio', 'negative_ratio', 'avg_confidence', 'avg_toxicity',
+    'total_hate_speech', 'total_profanity', 'contains_links_ratio', 'excessive_caps_ratio',
+    'linkedin_bio_count', 'linkedin_popular_count', 'profanity_posts',
+    'professional_keywords_total', 'politeness_keywords_total', 'spam_posts',
+    'active_platforms', 'total_followers', 'total_following', 'total_posts',
+    'total_engagements', 'total_possible',
+)
 
 
 class ScoringEngine:
@@ -33,7 +47,7 @@ class ScoringEngine:
         self,
         sentiment_data: Dict,
         digital_footprints: List[Dict],
-        content_analyses: List[Dict]
+        content_analyses: ContentAnalyses
     ) -> Dict:
         sentiment_score = self._calculate_sentiment_score(sentiment_data)
         professionalism_score = self._calculate_professionalism_score(digital_footprints, content_analyses)
@@ -47,10 +61,80 @@ class ScoringEngine:
             social_score * self.weights['social']
         )
 
-        # Insights and flags
         keyword_stats = self._aggregate_keywords(content_analyses)
-        risk_flags = self._identify_risk_flags(sentiment_data, content_analyses, engagement_insights, keyword_stats)
-        positive_indicators = self._identify_positive_indicators(sentiment_data, digital_footprints, engagement_insights, keyword_stats)
+        linkedin_count = sum(1 for fp in digital_footprints if fp.get('platform') == 'linkedin')
+        network_size = sum(fp.get('follower_count', 0) + fp.get('following_count', 0)
+                           for fp in digital_footprints)
+
+        return self._build_result(
+            scores={
+                'overall_score': overall_score,
+                'sentiment_score': sentiment_score,
+                'professionalism_score': professionalism_score,
+                'digital_ethics_score': digital_ethics_score,
+                'social_score': social_score,
+            },
+            sentiment_data=sentiment_data,
+            engagement_insights=engagement_insights,
+            keyword_stats=keyword_stats,
+            linkedin_count=linkedin_count,
+            network_size=network_size,
+        )
+
+    def rescore_aggregates(self, aggregates: List[Dict]) -> List[Dict]:
+        # Recompute full scoring results from stored aggregates (no posts or footprints).
+        # Each item holds 'sentiment_data', 'engagement_insights' and 'scoring_features'.
+        if not aggregates:
+            return []
+
+        batch = self.score_batch(self.stack_features([a['scoring_features'] for a in aggregates]))
+
+        results = []
+        for i, aggregate in enumerate(aggregates):
+            features = aggregate['scoring_features']
+            results.append(self._build_result(
+                scores={
+                    name: float(batch[name][i])
+                    for name in ('overall_score', 'sentiment_score', 'professionalism_score',
+                                 'digital_ethics_score', 'social_score')
+                },
+                sentiment_data=aggregate['sentiment_data'],
+                engagement_insights=aggregate['engagement_insights'],
+                keyword_stats={
+                    'total': features.get('keyword_total', 0),
+                    'top_keywords': features.get('top_keywords', []),
+                    'top_ratio': features.get('keyword_top_ratio', 0.0),
+                },
+                linkedin_count=features.get('linkedin_count', 0),
+                network_size=features['total_followers'] + features['total_following'],
+            ))
+        return results
+
+    def score_features(self, sentiment_data: Dict, digital_footprints: List[Dict], features: Dict) -> Dict:
+        # calculate_overall_score for callers holding aggregated totals instead of per-post analyses
+        _, engagement_insights = self._calculate_social_score(digital_footprints)
+        return self.rescore_aggregates([{
+            'sentiment_data': sentiment_data,
+            'engagement_insights': engagement_insights,
+            'scoring_features': features,
+        }])[0]
+
+    def _build_result(
+        self,
+        scores: Dict[str, float],
+        sentiment_data: Dict,
+        engagement_insights: Dict,
+        keyword_stats: Dict,
+        linkedin_count: int,
+        network_size: int
+    ) -> Dict:
+        overall_score = scores['overall_score']
+
+        # Insights and flags
+        risk_flags = self._identify_risk_flags(sentiment_data, engagement_insights, keyword_stats)
+        positive_indicators = self._identify_positive_indicators(
+            sentiment_data, linkedin_count, network_size, engagement_insights, keyword_stats
+        )
 
         recommendation = self._determine_recommendation(overall_score, risk_flags)
         recommendation_reason = self._generate_recommendation_reason(
@@ -71,10 +155,10 @@ class ScoringEngine:
         return {
             'overall_score': round(overall_score, 2),
             'technical_score': 0.0,
-            'social_score': round(social_score, 2),
-            'digital_ethics_score': round(digital_ethics_score, 2),
-            'professionalism_score': round(professionalism_score, 2),
-            'sentiment_score': round(sentiment_score, 2),
+            'social_score': round(scores['social_score'], 2),
+            'digital_ethics_score': round(scores['digital_ethics_score'], 2),
+            'professionalism_score': round(scores['professionalism_score'], 2),
+            'sentiment_score': round(scores['sentiment_score'], 2),
             'positive_content_ratio': sentiment_data.get('positive_ratio', 0),
             'negative_content_ratio': sentiment_data.get('negative_ratio', 0),
             'neutral_content_ratio': sentiment_data.get('neutral_ratio', 0),
@@ -85,6 +169,177 @@ class ScoringEngine:
             'insights': insights,
         }
 
+    def extract_features(
+        self,
+        sentiment_data: Dict,
+        digital_footprints: List[Dict],
+        content_analyses: ContentAnalyses
+    ) -> Dict[str, float]:
+        return self.extract_features_from_totals(
+            sentiment_data, digital_footprints, self._content_totals(content_analyses)
+        )
+
+    def extract_features_from_totals(
+        self,
+        sentiment_data: Dict,
+        digital_footprints: List[Dict],
+        content_totals: Dict
+    ) -> Dict[str, float]:
+        # content_totals: per-post sums from _content_totals or SentimentAggregator.content_totals
+        features = {
+            'average_sentiment': sentiment_data.get('average_sentiment', 0.0),
+            'positive_ratio': sentiment_data.get('positive_ratio', 0.0),
+            'negative_ratio': sentiment_data.get('negative_ratio', 0.0),
+            'avg_confidence': sentiment_data.get('avg_confidence', 0.0),
+            'avg_toxicity': sentiment_data.get('avg_toxicity', 0.0),
+            'total_hate_speech': sentiment_data.get('total_hate_speech', 0),
+            'total_profanity': sentiment_data.get('total_profanity', 0),
+            'contains_links_ratio': sentiment_data.get('contains_links_ratio', 0.0),
+            'excessive_caps_ratio': sentiment_data.get('excessive_caps_ratio', 0.0),
+            'linkedin_bio_count': 0,
+            'linkedin_popular_count': 0,
+            'profanity_posts': content_totals['profanity_posts'],
+            'professional_keywords_total': content_totals['professional_keywords_total'],
+            'politeness_keywords_total': content_totals['politeness_keywords_total'],
+            'spam_posts': content_totals['spam_posts'],
+        }
+
+        for footprint in digital_footprints:
+            if footprint.get('platform') == 'linkedin':
+                if footprint.get('bio'):
+                    features['linkedin_bio_count'] += 1
+                if footprint.get('follower_count', 0) > 100:
+                    features['linkedin_popular_count'] += 1
+
+        _, engagement = self._calculate_social_score(digital_footprints)
+        features['active_platforms'] = engagement['active_platforms']
+        features['total_followers'] = engagement['total_followers']
+        features['total_following'] = sum(fp.get('following_count', 0) for fp in digital_footprints)
+        features['total_posts'] = engagement['total_posts']
+        features['total_engagements'] = engagement['total_engagements']
+        features['total_possible'] = engagement['total_possible']
+
+        # Non-scalar extras used to rebuild flags/indicators when re-scoring
+        keyword_stats = self._keyword_stats(content_totals['keyword_freq'])
+        features['linkedin_count'] = sum(1 for fp in digital_footprints if fp.get('platform') == 'linkedin')
+        features['keyword_total'] = keyword_stats['total']
+        features['keyword_top_ratio'] = keyword_stats['top_ratio']
+        features['top_keywords'] = [list(item) for item in keyword_stats['top_keywords']]
+
+        return features
+
+    def _content_totals(self, content_analyses: ContentAnalyses) -> Dict:
+        return {
+            'profanity_posts': sum(1 for c in content_analyses if c.get('contains_profanity', 0) > 0),
+            'professional_keywords_total': sum(c.get('professional_keywords_count', 0) for c in content_analyses),
+            'politeness_keywords_total': sum(c.get('politeness_keywords_count', 0) for c in content_analyses),
+            'spam_posts': sum(1 for c in content_analyses if c.get('spam_indicator', 0) == 1),
+            'keyword_freq': self._aggregate_keywords(content_analyses)['freq'],
+        }
+
+    def stack_features(self, candidates: List[Dict[str, float]]) -> Dict[str, np.ndarray]:
+        return {
+            name: np.array([c[name] for c in candidates], dtype=np.float64)
+            for name in FEATURE_NAMES
+        }
+
+    def score_batch(self, features: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        # Array form of calculate_overall_score; scores are unrounded, and every
+        # expression keeps the scalar path's operation order so results match exactly
+        f = {name: np.asarray(features[name], dtype=np.float64) for name in FEATURE_NAMES}
+
+        normalized_sentiment = (f['average_sentiment'] + 1) / 2
+        sentiment_score = np.clip((
+            normalized_sentiment * 0.55 +
+            f['positive_ratio'] * 0.35 -
+            f['negative_ratio'] * 0.25 +
+            f['avg_confidence'] * 0.05 -
+            f['avg_toxicity'] * 0.10
+        ) * 100, 0, 100)
+
+        professionalism_score = 70.0 + f['linkedin_bio_count'] * 10 + f['linkedin_popular_count'] * 5
+        professionalism_score = professionalism_score - f['profanity_posts'] * 5
+        professionalism_score = professionalism_score + np.minimum(
+            10, f['professional_keywords_total'] * 1.0 + f['politeness_keywords_total'] * 0.5
+        )
+        professionalism_score = professionalism_score - np.minimum(10, f['spam_posts'] * 2)
+        professionalism_score = np.clip(professionalism_score, 0, 100)
+
+        negative_ratio = f['negative_ratio']
+        avg_toxicity = f['avg_toxicity']
+        digital_ethics_score = 80.0 - f['total_hate_speech'] * 20
+        digital_ethics_score = digital_ethics_score - f['total_profanity'] * 5
+        digital_ethics_score = np.where(
+            negative_ratio > 0.3, digital_ethics_score - (negative_ratio - 0.3) * 50, digital_ethics_score
+        )
+        digital_ethics_score = np.where(
+            avg_toxicity > 0.6, digital_ethics_score - 10,
+            np.where(avg_toxicity < 0.1, digital_ethics_score + 2, digital_ethics_score)
+        )
+        digital_ethics_score = np.where(f['contains_links_ratio'] > 0.5, digital_ethics_score - 5, digital_ethics_score)
+        digital_ethics_score = np.where(f['excessive_caps_ratio'] > 0.3, digital_ethics_score - 3, digital_ethics_score)
+        digital_ethics_score = np.clip(digital_ethics_score, 0, 100)
+
+        social_score = self._social_score_batch(f)
+
+        overall_score = (
+            sentiment_score * self.weights['sentiment'] +
+            professionalism_score * self.weights['professionalism'] +
+            digital_ethics_score * self.weights['digital_ethics'] +
+            social_score * self.weights['social']
+        )
+
+        # Only hate speech is critical and only excessive profanity is high severity
+        has_hate_speech = f['total_hate_speech'] > 0
+        has_high_flag = f['total_profanity'] >= self.risk_thresholds['profanity_count']
+        recommendation = np.select(
+            [has_hate_speech, has_high_flag, overall_score >= 75, overall_score >= 60],
+            [
+                RecommendationStatus.TIDAK_LAYAK.value,
+                RecommendationStatus.DIPERTIMBANGKAN.value,
+                RecommendationStatus.LAYAK.value,
+                RecommendationStatus.DIPERTIMBANGKAN.value,
+            ],
+            default=RecommendationStatus.TIDAK_LAYAK.value,
+        ).astype(object)
+
+        return {
+            'overall_score': overall_score,
+            'sentiment_score': sentiment_score,
+            'professionalism_score': professionalism_score,
+            'digital_ethics_score': digital_ethics_score,
+            'social_score': social_score,
+            'recommendation': recommendation,
+        }
+
+    def _social_score_batch(self, f: Dict[str, np.ndarray]) -> np.ndarray:
+        active_platforms = f['active_platforms']
+        total_followers = f['total_followers']
+        total_following = f['total_following']
+        total_posts = f['total_posts']
+
+        score = 60.0 + np.minimum(active_platforms * 5, 20)
+        score = score + np.select([total_followers > 1000, total_followers > 500], [10, 5], default=0)
+        score = score + np.select([total_posts > 100, total_posts > 50], [10, 5], default=0)
+
+        total_possible = f['total_possible']
+        engagement_rate = np.divide(
+            f['total_engagements'], total_possible,
+            out=np.zeros_like(total_possible), where=total_possible > 0
+        )
+        score = score + np.select(
+            [engagement_rate > 0.05, engagement_rate > 0.02, (engagement_rate < 0.001) & (total_posts > 50)],
+            [10, 5, -5],
+            default=0,
+        )
+
+        follower_following_ratio = np.where(
+            total_following > 0, total_followers / np.maximum(total_following, 1), total_followers
+        )
+        score = np.where((follower_following_ratio < 0.3) & (total_posts > 100), score - 5, score)
+
+        return np.where(active_platforms > 0, np.minimum(100, score), 50.0)
+
     def _calculate_sentiment_score(self, sentiment_data: Dict) -> float:
         avg_sentiment = sentiment_data.get('average_sentiment', 0.0)
         positive_ratio = sentiment_data.get('positive_ratio', 0.0)
@@ -108,7 +363,7 @@ class ScoringEngine:
     def _calculate_professionalism_score(
         self,
         digital_footprints: List[Dict],
-        content_analyses: List[Dict]
+        content_analyses: ContentAnalyses
     ) -> float:
         score = 70.0
 
@@ -136,7 +391,7 @@ class ScoringEngine:
     def _calculate_digital_ethics_score(
         self,
         sentiment_data: Dict,
-        content_analyses: List[Dict]
+        content_analyses: ContentAnalyses
     ) -> float:
         score = 80.0
 
@@ -238,16 +493,18 @@ class ScoringEngine:
 
         return min(100, score), insights
 
-    def _aggregate_keywords(self, content_analyses: List[Dict]) -> Dict:
+    def _aggregate_keywords(self, content_analyses: ContentAnalyses) -> Dict:
         freq: Dict[str, int] = {}
-        total_keywords = 0
         for c in content_analyses:
             kws = c.get('keywords', []) or []
             for k in kws:
                 if not isinstance(k, str):
                     continue
-                total_keywords += 1
                 freq[k] = freq.get(k, 0) + 1
+        return self._keyword_stats(freq)
+
+    def _keyword_stats(self, freq: Dict[str, int]) -> Dict:
+        total_keywords = sum(freq.values())
         top = sorted(freq.items(), key=lambda x: x[1], reverse=True)[:10]
         top_ratio = (top[0][1] / total_keywords) if top and total_keywords > 0 else 0.0
         return {
@@ -257,7 +514,7 @@ class ScoringEngine:
             'top_ratio': top_ratio,
         }
 
-    def _identify_risk_flags(self, sentiment_data: Dict, content_analyses: List[Dict], engagement_insights: Dict, keyword_stats: Dict) -> Dict:
+    def _identify_risk_flags(self, sentiment_data: Dict, engagement_insights: Dict, keyword_stats: Dict) -> Dict:
         flags: Dict[str, Dict] = {}
 
         if sentiment_data.get('total_hate_speech', 0) > 0:
@@ -338,7 +595,8 @@ class ScoringEngine:
     def _identify_positive_indicators(
         self,
         sentiment_data: Dict,
-        digital_footprints: List[Dict],
+        linkedin_count: int,
+        network_size: int,
         engagement_insights: Dict,
         keyword_stats: Dict
     ) -> Dict:
@@ -355,18 +613,15 @@ class ScoringEngine:
                 'description': 'Jejak digital bersih tanpa konten negatif'
             }
 
-        professional_platforms = [fp for fp in digital_footprints if fp.get('platform') == 'linkedin']
-        if professional_platforms:
+        if linkedin_count:
             indicators['professional_presence'] = {
-                'platforms': len(professional_platforms),
+                'platforms': linkedin_count,
                 'description': 'Memiliki kehadiran di platform profesional'
             }
 
-        total_engagement = sum(fp.get('follower_count', 0) + fp.get('following_count', 0)
-                              for fp in digital_footprints)
-        if total_engagement > 1000:
+        if network_size > 1000:
             indicators['good_social_engagement'] = {
-                'score': total_engagement,
+                'score': network_size,
                 'description': 'Engagement sosial media yang baik'
             }
 
@@ -0,0 +1,112 @@
+from typing import Dict, Iterable, Optional, Union
+from app.services.ai.post_analysis import PostAnalysis
+
+# Running sums; everything SentimentAnalyzer.calculate_aggregate_sentiment and the
+# content-derived scoring features need is a sum or count, so states merge by addition
+_SUM_FIELDS = (
+    'count', 'sentiment_sum', 'positive', 'negative', 'neutral',
+    'profanity', 'hate_speech', 'political', 'confidence_sum', 'toxicity_sum',
+    'link_posts', 'caps_posts', 'exclamation_sum', 'professional_keywords', 'politeness_keywords',
+    'profanity_posts', 'spam_posts',
+)
+
+
+class SentimentAggregator:
+    """Additive aggregate over per-post analyses, storable as JSON and mergeable."""
+
+    __slots__ = _SUM_FIELDS + ('languages', 'keyword_freq', 'version')
+
+    def __init__(self, version: Optional[str] = None):
+        for field in _SUM_FIELDS:
+            setattr(self, field, 0)
+        self.languages = {'id': 0, 'en': 0, 'unknown': 0}
+        self.keyword_freq: Dict[str, int] = {}
+        self.version = version
+
+    def add(self, analyses: Iterable[Union[PostAnalysis, Dict]]) -> 'SentimentAggregator':
+        for a in analyses:
+            self.count += 1
+            self.sentiment_sum += a.get('sentiment_score', 0.0)
+            label = a.get('sentiment_label')
+            if label in ('positive', 'negative', 'neutral'):
+                setattr(self, label, getattr(self, label) + 1)
+            profanity = a.get('contains_profanity', 0)
+            self.profanity += profanity
+            self.profanity_posts += 1 if profanity > 0 else 0
+            self.hate_speech += a.get('contains_hate_speech', 0)
+            self.political += a.get('contains_political_content', 0)
+            self.confidence_sum += a.get('confidence', 0.0)
+            self.toxicity_sum += a.get('toxicity_score', 0.0)
+            self.link_posts += 1 if a.get('contains_link', 0) == 1 else 0
+            self.caps_posts += 1 if a.get('caps_ratio', 0.0) > 0.5 else 0
+            self.exclamation_sum += a.get('exclamation_count', 0)
+            self.professional_keywords += a.get('professional_keywords_count', 0)
+            self.politeness_keywords += a.get('politeness_keywords_count', 0)
+            self.spam_posts += 1 if a.get('spam_indicator', 0) == 1 else 0
+
+            lang = a.get('likely_language', 'unknown')
+            self.languages[lang if lang in self.languages else 'unknown'] += 1
+            for keyword in a.get('keywords', []) or []:
+                if isinstance(keyword, str):
+                    self.keyword_freq[keyword] = self.keyword_freq.get(keyword, 0) + 1
+        return self
+
+    def merge(self, other: 'SentimentAggregator') -> 'SentimentAggregator':
+        for field in _SUM_FIELDS:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+        for lang, count in other.languages.items():
+            self.languages[lang] += count
+        for keyword, count in other.keyword_freq.items():
+            self.keyword_freq[keyword] = self.keyword_freq.get(keyword, 0) + count
+        return self
+
+    def to_state(self) -> Dict:
+        state = {field: getattr(self, field) for field in _SUM_FIELDS}
+        state['languages'] = dict(self.languages)
+        state['keyword_freq'] = dict(self.keyword_freq)
+        state['version'] = self.version
+        return state
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'SentimentAggregator':
+        aggregator = cls(state.get('version'))
+        for field in _SUM_FIELDS:
+            setattr(aggregator, field, state.get(field, 0))
+        aggregator.languages.update(state.get('languages') or {})
+        aggregator.keyword_freq = dict(state.get('keyword_freq') or {})
+        return aggregator
+
+    def sentiment_data(self) -> Dict:
+        # Same keys and values as SentimentAnalyzer.calculate_aggregate_sentiment; an
+        # empty aggregate has all sums at 0, so dividing by 1 yields its 0.0 defaults
+        total = max(self.count, 1)
+        lang_dist = dict(self.languages)
+        primary_language = max(lang_dist, key=lambda k: lang_dist[k]) if self.count else 'unknown'
+        return {
+            'average_sentiment': self.sentiment_sum / total,
+            'positive_ratio': self.positive / total,
+            'negative_ratio': self.negative / total,
+            'neutral_ratio': self.neutral / total,
+            'total_profanity': self.profanity,
+            'total_hate_speech': self.hate_speech,
+            'total_political': self.political,
+            # Enriched aggregates
+            'avg_confidence': self.confidence_sum / total,
+            'avg_toxicity': self.toxicity_sum / total,
+            'contains_links_ratio': self.link_posts / total,
+            'excessive_caps_ratio': self.caps_posts / total,
+            'exclamation_avg': self.exclamation_sum / total,
+            'language_distribution': lang_dist,
+            'primary_language': primary_language,
+            'professional_keywords_total': self.professional_keywords,
+        }
+
+    def content_totals(self) -> Dict:
+        # Per-post inputs of ScoringEngine.extract_features_from_totals
+        return {
+            'profanity_posts': self.profanity_posts,
+            'professional_keywords_total': self.professional_keywords,
+            'politeness_keywords_total': self.politeness_keywords,
+            'spam_posts': self.spam_posts,
+            'keyword_freq': dict(self.keyword_freq),
+        }
@@ -1,19 +1,72 @@
-from textblob import TextBlob
-from typing import Dict, List
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from operator import attrgetter, itemgetter
+from threading import Lock
+from typing import Dict, List, Optional, Tuple, Union
+import hashlib
+import json
+import multiprocessing
+import os
 import re
-import nltk
+import numpy as np
 from app.core.config import settings
+from app.services.ai.analysis_cache import AnalysisCache, analysis_cache
+from app.services.ai.persistent_cache import get_persistent_cache
+from app.services.ai.sentiment_backends import SentimentBackend, get_sentiment_backend
+from app.services.ai.post_analysis import PostAnalysis
+from app.services.ai.lexicon_matcher import LexiconMatcher, TokenLexiconIndex
+from app.services.ai.text_features import TextFeatures
 
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
+# Bump when analyze_text logic changes so cached results are not reused
+ANALYZER_VERSION = '1'
+
+# Below this many analyses the plain per-row loops are cheaper than packing arrays
+COLUMNAR_AGGREGATE_MIN = 256
+
+_NUMERIC_FIELDS = (
+    ('sentiment_score', 0.0),
+    ('confidence', 0.0),
+    ('toxicity_score', 0.0),
+    ('caps_ratio', 0.0),
+    ('exclamation_count', 0),
+    ('contains_link', 0),
+    ('contains_profanity', 0),
+    ('contains_hate_speech', 0),
+    ('contains_political_content', 0),
+    ('professional_keywords_count', 0),
+)
+
+
+# Worker-local analyzer, built once per pool process by _init_worker
+_worker_analyzer = None
+
+
+def _init_worker(config: Dict) -> None:
+    global _worker_analyzer
+    _worker_analyzer = SentimentAnalyzer()
+    _worker_analyzer.apply_config(config)
+
+
+def _analyze_chunk(texts: List[str]) -> List[PostAnalysis]:
+    return _worker_analyzer._analyze_many(texts)
 
 
 class SentimentAnalyzer:
     def __init__(self):
+        self._version: Optional[str] = None
+        self.cache = analysis_cache
+        self.persistent_cache = get_persistent_cache()
         self.negative_threshold = settings.SENTIMENT_THRESHOLD_NEGATIVE
         self.positive_threshold = settings.SENTIMENT_THRESHOLD_POSITIVE
+        self.match_mode = settings.LEXICON_MATCH_MODE
+        self.backend = settings.SENTIMENT_BACKEND
+
+        self.batch_workers = settings.ANALYZER_WORKERS or os.cpu_count() or 1
+        self.batch_chunk_size = max(settings.ANALYZER_CHUNK_SIZE, 1)
+        self.parallel_min_batch = settings.ANALYZER_PARALLEL_MIN_BATCH
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_config: Optional[Dict] = None
+        self._pool_lock = Lock()
 
         # Expanded lexicons for richer detection
         self.profanity_keywords = [
@@ -55,32 +108,149 @@ class SentimentAnalyzer:
             'of', 'by', 'with', 'this', 'that', 'it', 'or', 'but', 'from'
         }
 
+        self.rebuild_lexicons()
+
+    @property
+    def backend(self) -> str:
+        return self._backend_name
+
+    @backend.setter
+    def backend(self, name: str) -> None:
+        # TextBlob by default; see app.services.ai.sentiment_backends
+        self._backend_name = name
+        self._sentiment_backend: Optional[SentimentBackend] = None
+        self._version = None
+
+    @property
+    def sentiment_backend(self) -> SentimentBackend:
+        if self._sentiment_backend is None:
+            self._sentiment_backend = get_sentiment_backend(self._backend_name)
+        return self._sentiment_backend
+
+    def warm_up(self) -> None:
+        # Pays the NLP imports and first-analysis costs up front, e.g. at app startup
+        self.version
+        self._analyze_uncached('Siap melayani masyarakat dengan integritas')
+
+    @property
+    def negative_threshold(self) -> float:
+        return self._negative_threshold
+
+    @negative_threshold.setter
+    def negative_threshold(self, value: float) -> None:
+        self._negative_threshold = value
+        self._version = None
+
+    @property
+    def positive_threshold(self) -> float:
+        return self._positive_threshold
+
+    @positive_threshold.setter
+    def positive_threshold(self, value: float) -> None:
+        self._positive_threshold = value
+        self._version = None
+
+    @property
+    def version(self) -> str:
+        # Cache namespace: changes whenever thresholds or lexicons change
+        if self._version is None:
+            payload = json.dumps([ANALYZER_VERSION, self.get_config(), self.sentiment_backend.identity], sort_keys=True)
+            self._version = hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+        return self._version
+
+    def rebuild_lexicons(self) -> None:
+        # Must be called after mutating any keyword list so the matcher sees it
+        self._version = None
+        lexicons = {
+            'profanity': self.profanity_keywords,
+            'hate_speech': self.hate_speech_keywords,
+            'political': self.political_keywords,
+            'professional': self.professional_keywords,
+            'politeness': self.politeness_keywords,
+        }
+        if self.match_mode == 'token':
+            self.lexicon_matcher = TokenLexiconIndex(lexicons)
+        elif self.match_mode == 'substring':
+            self.lexicon_matcher = LexiconMatcher(lexicons)
+        else:
+            raise ValueError(f"Unknown lexicon match mode: {self.match_mode}")
+
+    def get_config(self) -> Dict:
+        return {
+            'backend': self.backend,
+            'negative_threshold': self.negative_threshold,
+            'positive_threshold': self.positive_threshold,
+            'match_mode': self.match_mode,
+            'profanity_keywords': list(self.profanity_keywords),
+            'hate_speech_keywords': list(self.hate_speech_keywords),
+            'political_keywords': list(self.political_keywords),
+            'professional_keywords': list(self.professional_keywords),
+            'politeness_keywords': list(self.politeness_keywords),
+        }
+
+    def apply_config(self, config: Dict) -> None:
+        for key, value in config.items():
+            setattr(self, key, value)
+        self.rebuild_lexicons()
+
     def analyze_text(self, text: str) -> Dict:
+        return self.analyze_post(text).to_dict()
+
+    def analyze_post(self, text: str) -> PostAnalysis:
         if not text or not text.strip():
             return self._empty_result()
 
-        text_clean = text.strip()
-        text_lower = text_clean.lower()
-
-        blob = TextBlob(text_lower)
-        polarity = blob.sentiment.polarity
-        subjectivity = blob.sentiment.subjectivity
+        key = AnalysisCache.make_key(text, self.version)
+        cached = self._get_cached(key)
+        if cached is not None:
+            return cached
+
+        result = self._analyze_uncached(text)
+        self._store_cached(key, result)
+        return result
+
+    def _get_cached(self, key: str) -> Optional[PostAnalysis]:
+        cached = self.cache.get(key)
+        if cached is None and self.persistent_cache is not None:
+            stored = self.persistent_cache.get(key, self.version)
+            if stored is not None:
+                cached = PostAnalysis.from_dict(stored)
+                self.cache.set(key, cached)
+        return cached
+
+    def _store_cached(self, key: str, result: PostAnalysis) -> None:
+        self.cache.set(key, result)
+        if self.persistent_cache is not None:
+            self.persistent_cache.set(key, self.version, result.to_dict())
+
+    def _analyze_many(self, texts: List[str]) -> List[PostAnalysis]:
+        # One backend call for the whole list, so batched backends see every text at once
+        if not texts:
+            return []
+        scores = self.sentiment_backend.score(texts)
+        return [self._analyze_uncached(text, score) for text, score in zip(texts, scores)]
+
+    def _analyze_uncached(self, text: str, score: Optional[Tuple[float, float]] = None) -> PostAnalysis:
+        features = TextFeatures(text)
+
+        polarity, confidence = score or self.sentiment_backend.score([text])[0]
 
         sentiment_label = self._get_sentiment_label(polarity)
 
-        contains_profanity = self._contains_keywords(text_lower, self.profanity_keywords)
-        contains_hate_speech = self._contains_keywords(text_lower, self.hate_speech_keywords)
-        contains_political = self._contains_keywords(text_lower, self.political_keywords)
+        lexicon_hits = self._match_lexicons(features)
+        contains_profanity = lexicon_hits['profanity'] > 0
+        contains_hate_speech = lexicon_hits['hate_speech'] > 0
+        contains_political = lexicon_hits['political'] > 0
 
-        contains_link = self._contains_link(text_lower)
-        caps_ratio = self._caps_ratio(text_clean)
-        exclamation_count = text_clean.count('!')
+        contains_link = self._contains_link(features.lower)
+        caps_ratio = features.caps_ratio
+        exclamation_count = features.exclamation_count
 
-        keywords = self._extract_keywords(text_lower)
-        professional_kw_count = self._count_keywords(text_lower, self.professional_keywords)
-        politeness_kw_count = self._count_keywords(text_lower, self.politeness_keywords)
+        keywords = self._extract_keywords(features.tokens)
+        professional_kw_count = lexicon_hits['professional']
+        politeness_kw_count = lexicon_hits['politeness']
 
-        likely_language, id_ratio, en_ratio = self._guess_language(text_lower)
+        likely_language, id_ratio, en_ratio = self._guess_language(features.tokens)
         toxicity_score = self._compute_toxicity(
             polarity=polarity,
             contains_profanity=contains_profanity,
@@ -91,31 +261,99 @@ class SentimentAnalyzer:
 
         spam_indicator = 1 if (contains_link and exclamation_count >= 3) else 0
 
-        return {
-            'sentiment_label': sentiment_label,
-            'sentiment_score': polarity,
-            'confidence': 1 - subjectivity,
-            'contains_profanity': 1 if contains_profanity else 0,
-            'contains_hate_speech': 1 if contains_hate_speech else 0,
-            'contains_political_content': 1 if contains_political else 0,
-            'keywords': keywords,
+        return PostAnalysis(
+            sentiment_label=sentiment_label,
+            sentiment_score=polarity,
+            confidence=confidence,
+            contains_profanity=1 if contains_profanity else 0,
+            contains_hate_speech=1 if contains_hate_speech else 0,
+            contains_political_content=1 if contains_political else 0,
+            keywords=tuple(keywords),
             # New enrichment fields (backwards-compatible)
-            'contains_link': 1 if contains_link else 0,
-            'caps_ratio': caps_ratio,
-            'exclamation_count': exclamation_count,
-            'likely_language': likely_language,
-            'id_stopword_ratio': id_ratio,
-            'en_stopword_ratio': en_ratio,
-            'toxicity_score': toxicity_score,
-            'spam_indicator': spam_indicator,
-            'professional_keywords_count': professional_kw_count,
-            'politeness_keywords_count': politeness_kw_count,
-        }
-
-    def analyze_batch(self, texts: List[str]) -> List[Dict]:
-        return [self.analyze_text(text) for text in texts]
+            contains_link=1 if contains_link else 0,
+            caps_ratio=caps_ratio,
+            exclamation_count=exclamation_count,
+            likely_language=likely_language,
+            id_stopword_ratio=id_ratio,
+            en_stopword_ratio=en_ratio,
+            toxicity_score=toxicity_score,
+            spam_indicator=spam_indicator,
+            professional_keywords_count=professional_kw_count,
+            politeness_keywords_count=politeness_kw_count,
+        )
 
-    def calculate_aggregate_sentiment(self, analyses: List[Dict]) -> Dict:
+    def analyze_batch(self, texts: List[str], parallel: Optional[bool] = None) -> List[Dict]:
+        return [record.to_dict() for record in self.analyze_posts(texts, parallel)]
+
+    def analyze_posts(self, texts: List[str], parallel: Optional[bool] = None) -> List[PostAnalysis]:
+        if parallel is None:
+            parallel = len(texts) >= self.parallel_min_batch
+        batched = self.sentiment_backend.batched
+        if not batched and (not parallel or self.batch_workers < 2 or len(texts) <= self.batch_chunk_size):
+            return [self.analyze_post(text) for text in texts]
+
+        # Resolve cache hits here so only misses are scored
+        version = self.version
+        results: List[Optional[PostAnalysis]] = []
+        pending: List[int] = []
+        for index, text in enumerate(texts):
+            if not text or not text.strip():
+                results.append(self._empty_result())
+                continue
+            cached = self._get_cached(AnalysisCache.make_key(text, version))
+            results.append(cached)
+            if cached is None:
+                pending.append(index)
+
+        if batched:
+            # Batched backends parallelise inside the model (torch threads), so they run
+            # in this process rather than loading one model copy per pool worker
+            for index, result in zip(pending, self._analyze_many([texts[i] for i in pending])):
+                results[index] = result
+                self._store_cached(AnalysisCache.make_key(texts[index], version), result)
+            return results
+
+        size = self.batch_chunk_size
+        chunks = [[texts[i] for i in pending[j:j + size]] for j in range(0, len(pending), size)]
+
+        # Executor.map yields chunk results in submission order
+        pending_iter = iter(pending)
+        for chunk_result in self._get_pool().map(_analyze_chunk, chunks):
+            for result in chunk_result:
+                index = next(pending_iter)
+                results[index] = result
+                self._store_cached(AnalysisCache.make_key(texts[index], version), result)
+        return results
+
+    def close(self) -> None:
+        with self._pool_lock:
+            self._close_pool()
+
+    def _close_pool(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            self._pool_config = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Workers hold a copy of the lexicons/thresholds; respawn if they changed.
+        # Locked because one analyzer may be shared by several job threads
+        config = self.get_config()
+        with self._pool_lock:
+            if self._pool is not None and config != self._pool_config:
+                self._close_pool()
+            if self._pool is None:
+                # spawn: the API and job threads share this analyzer, and threads must not be forked
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.batch_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(config,),
+                )
+                self._pool_config = config
+            return self._pool
+
+    def calculate_aggregate_sentiment(self, analyses: List[Union[PostAnalysis, Dict]]) -> Dict:
         if not analyses:
             return {
                 'average_sentiment': 0.0,
@@ -136,6 +374,9 @@ class SentimentAnalyzer:
                 'professional_keywords_total': 0,
             }
 
+        if len(analyses) >= COLUMNAR_AGGREGATE_MIN:
+            return self._aggregate_columnar(analyses)
+
         sentiments = [a.get('sentiment_score', 0.0) for a in analyses]
         avg_sentiment = sum(sentiments) / max(len(sentiments), 1)
 
@@ -180,6 +421,53 @@ class SentimentAnalyzer:
             'professional_keywords_total': prof_total,
         }
 
+    def _aggregate_columnar(self, analyses: List[Union[PostAnalysis, Dict]]) -> Dict:
+        total = len(analyses)
+        getter = attrgetter if isinstance(analyses[0], PostAnalysis) else itemgetter
+        try:
+            # attrgetter/itemgetter + fromiter keep the per-row work in C for complete analyzer output
+            columns = {
+                field: np.fromiter(map(getter(field), analyses), np.float64, total)
+                for field, _ in _NUMERIC_FIELDS
+            }
+            labels = Counter(map(getter('sentiment_label'), analyses))
+            languages = Counter(map(getter('likely_language'), analyses))
+        except (KeyError, AttributeError):
+            columns = {
+                field: np.fromiter((a.get(field, default) for a in analyses), np.float64, total)
+                for field, default in _NUMERIC_FIELDS
+            }
+            labels = Counter(a.get('sentiment_label') for a in analyses)
+            languages = Counter(a.get('likely_language', 'unknown') for a in analyses)
+
+        lang_dist = {'id': languages['id'], 'en': languages['en']}
+        lang_dist['unknown'] = total - lang_dist['id'] - lang_dist['en']
+        primary_language = max(lang_dist, key=lambda k: lang_dist[k])
+
+        return {
+            'average_sentiment': float(columns['sentiment_score'].sum()) / total,
+            'positive_ratio': labels['positive'] / total,
+            'negative_ratio': labels['negative'] / total,
+            'neutral_ratio': labels['neutral'] / total,
+            'total_profanity': int(columns['contains_profanity'].sum()),
+            'total_hate_speech': int(columns['contains_hate_speech'].sum()),
+            'total_political': int(columns['contains_political_content'].sum()),
+            # Enriched aggregates
+            'avg_confidence': float(columns['confidence'].sum()) / total,
+            'avg_toxicity': float(columns['toxicity_score'].sum()) / total,
+            'contains_links_ratio': int(np.count_nonzero(columns['contains_link'] == 1)) / total,
+            'excessive_caps_ratio': int(np.count_nonzero(columns['caps_ratio'] > 0.5)) / total,
+            'exclamation_avg': float(columns['exclamation_count'].sum()) / total,
+            'language_distribution': lang_dist,
+            'primary_language': primary_language,
+            'professional_keywords_total': int(columns['professional_keywords_count'].sum()),
+        }
+
+    def _match_lexicons(self, features: TextFeatures) -> Dict[str, int]:
+        if self.match_mode == 'token':
+            return self.lexicon_matcher.count(features.tokens)
+        return self.lexicon_matcher.count(features.lower)
+
     def _get_sentiment_label(self, polarity: float) -> str:
         if polarity >= self.positive_threshold:
             return 'positive'
@@ -188,28 +476,14 @@ class SentimentAnalyzer:
         else:
             return 'neutral'
 
-    def _contains_keywords(self, text: str, keywords: List[str]) -> bool:
-        for keyword in keywords:
-            if keyword in text:
-                return True
-        return False
-
-    def _count_keywords(self, text: str, keywords: List[str]) -> int:
-        count = 0
-        for kw in keywords:
-            count += text.count(kw)
-        return count
-
-    def _extract_keywords(self, text: str, top_n: int = 10) -> List[str]:
-        words = re.findall(r'\b\w+\b', text.lower())
-
+    def _extract_keywords(self, tokens: List[str], top_n: int = 10) -> List[str]:
         stopwords = {
             'yang', 'dan', 'di', 'ke', 'dari', 'ini', 'itu', 'dengan',
             'untuk', 'pada', 'adalah', 'oleh', 'dalam', 'atau', 'juga',
             'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to'
         }
 
-        words = [w for w in words if w not in stopwords and len(w) > 3]
+        words = [w for w in tokens if w not in stopwords and len(w) > 3]
 
         word_freq: Dict[str, int] = {}
         for word in words:
@@ -221,15 +495,7 @@ class SentimentAnalyzer:
     def _contains_link(self, text: str) -> bool:
         return re.search(r'(https?://|www\.|\.[a-z]{2,3}/)', text) is not None
 
-    def _caps_ratio(self, text: str) -> float:
-        letters = [c for c in text if c.isalpha()]
-        if not letters:
-            return 0.0
-        upper = sum(1 for c in letters if c.isupper())
-        return upper / len(letters)
-
-    def _guess_language(self, text: str):
-        words = re.findall(r'\b\w+\b', text)
+    def _guess_language(self, words: List[str]):
         if not words:
             return 'unknown', 0.0, 0.0
         id_hits = sum(1 for w in words if w in self.id_stopwords)
@@ -259,23 +525,5 @@ class SentimentAnalyzer:
             score += 0.1
         return min(score, 1.0)
 
-    def _empty_result(self) -> Dict:
-        return {
-            'sentiment_label': 'neutral',
-            'sentiment_score': 0.0,
-            'confidence': 0.0,
-            'contains_profanity': 0,
-            'contains_hate_speech': 0,
-            'contains_political_content': 0,
-            'keywords': [],
-            'contains_link': 0,
-            'caps_ratio': 0.0,
-            'exclamation_count': 0,
-            'likely_language': 'unknown',
-            'id_stopword_ratio': 0.0,
-            'en_stopword_ratio': 0.0,
-            'toxicity_score': 0.0,
-            'spam_indicator': 0,
-            'professional_keywords_count': 0,
-            'politeness_keywords_count': 0,
-        }
+    def _empty_result(self) -> PostAnalysis:
+        return PostAnalysis()
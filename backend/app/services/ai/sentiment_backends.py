@@ -0,0 +1,186 @@
+from threading import Lock
+from typing import Dict, List, Optional, Sequence, Tuple
+from app.core.config import settings
+from app.services.ai.nlp_resources import ensure_resources
+
+# (polarity in [-1, 1], confidence in [0, 1]) per text
+Score = Tuple[float, float]
+
+
+class SentimentBackend:
+    """Scores the polarity of texts; SentimentAnalyzer builds everything else around it.
+
+    Construction must stay cheap: heavy models are loaded on the first score() call.
+    """
+
+    name = 'base'
+    # True when scoring many texts per call is much cheaper than one at a time
+    batched = False
+    # NLTK data the backend loads, e.g. 'tokenizers/punkt'
+    resources: Tuple[str, ...] = ()
+
+    def required_resources(self) -> List[str]:
+        # Plus any extra NLTK_RESOURCES the deployment asks for
+        return list(dict.fromkeys([*self.resources, *settings.NLTK_RESOURCES]))
+
+    @property
+    def identity(self) -> Dict:
+        # Part of the analyzer's cache version, so results from different backends never mix
+        return {'name': self.name}
+
+    def score(self, texts: Sequence[str]) -> List[Score]:
+        raise NotImplementedError
+
+
+class TextBlobBackend(SentimentBackend):
+    """TextBlob's English pattern lexicon: fast, no model, the default.
+
+    The lexicon ships with textblob, and texts are scored whole, so no NLTK data is needed.
+    """
+
+    name = 'textblob'
+
+    def __init__(self):
+        self._analyzer = None
+        self._lock = Lock()
+
+    def _load(self):
+        if self._analyzer is None:
+            with self._lock:
+                if self._analyzer is None:
+                    ensure_resources(self.required_resources())
+                    from textblob.en.sentiments import PatternAnalyzer
+
+                    # Same analyzer TextBlob uses by default, without building a blob per post
+                    self._analyzer = PatternAnalyzer()
+        return self._analyzer
+
+    def score(self, texts: Sequence[str]) -> List[Score]:
+        analyzer = self._load()
+        scores = []
+        for text in texts:
+            sentiment = analyzer.analyze(text.lower())
+            scores.append((sentiment.polarity, 1 - sentiment.subjectivity))
+        return scores
+
+
+def batch_by_tokens(lengths: Sequence[int], max_tokens: int, max_batch_size: int = 256) -> List[List[int]]:
+    """Groups indices of similar length so each padded batch stays within max_tokens.
+
+    Sorting by length first keeps padding low; a batch closes when adding the next
+    (longer) text would push longest_length * batch_size past the budget.
+    """
+    batches: List[List[int]] = []
+    batch: List[int] = []
+    for index in sorted(range(len(lengths)), key=lambda i: lengths[i]):
+        longest = max(lengths[index], 1)
+        if batch and (longest * (len(batch) + 1) > max_tokens or len(batch) >= max_batch_size):
+            batches.append(batch)
+            batch = []
+        batch.append(index)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class TransformerBackend(SentimentBackend):
+    """Sequence-classification transformer on CPU (torch + transformers, imported lazily).
+
+    Texts are truncated to max_length tokens and scored in length-sorted batches of at
+    most batch_tokens padded tokens. Polarity is P(positive) - P(negative) from the
+    model's own labels; confidence is the top class probability.
+    """
+
+    name = 'transformer'
+    batched = True
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        max_length: Optional[int] = None,
+        batch_tokens: Optional[int] = None,
+        num_threads: Optional[int] = None
+    ):
+        self.model_name = model_name or settings.SENTIMENT_TRANSFORMER_MODEL
+        self.max_length = max_length or settings.SENTIMENT_TRANSFORMER_MAX_LENGTH
+        self.batch_tokens = max(batch_tokens or settings.SENTIMENT_TRANSFORMER_BATCH_TOKENS, self.max_length)
+        self.num_threads = settings.SENTIMENT_TRANSFORMER_THREADS if num_threads is None else num_threads
+        self._model = None
+        self._tokenizer = None
+        self._label_weights = None
+        self._torch = None
+        self._lock = Lock()
+
+    @property
+    def identity(self) -> Dict:
+        return {'name': self.name, 'model': self.model_name, 'max_length': self.max_length}
+
+    def _load(self) -> None:
+        if self._model is not None:
+            return
+        with self._lock:
+            if self._model is not None:
+                return
+            ensure_resources(self.required_resources())
+            try:
+                import torch
+                from transformers import AutoModelForSequenceClassification, AutoTokenizer
+            except ImportError as e:
+                raise ImportError(
+                    "SENTIMENT_BACKEND=transformer requires the torch and transformers packages"
+                ) from e
+
+            if self.num_threads:
+                # Process-wide; size it to the cores this worker should use
+                torch.set_num_threads(self.num_threads)
+
+            # NLP_OFFLINE: use only the local Hugging Face cache, never the network
+            tokenizer = AutoTokenizer.from_pretrained(self.model_name, local_files_only=settings.NLP_OFFLINE)
+            model = AutoModelForSequenceClassification.from_pretrained(
+                self.model_name, local_files_only=settings.NLP_OFFLINE
+            )
+            model.to('cpu')
+            model.eval()
+
+            weights = []
+            for index in range(model.config.num_labels):
+                label = str(model.config.id2label.get(index, '')).lower()
+                weights.append(1.0 if label.startswith('pos') else -1.0 if label.startswith('neg') else 0.0)
+            if not any(weights):
+                raise ValueError(f"Model {self.model_name} has no positive/negative labels: {model.config.id2label}")
+
+            self._torch = torch
+            self._tokenizer = tokenizer
+            self._label_weights = torch.tensor(weights)
+            self._model = model
+
+    def score(self, texts: Sequence[str]) -> List[Score]:
+        if not texts:
+            return []
+        self._load()
+        torch = self._torch
+
+        input_ids = self._tokenizer(list(texts), truncation=True, max_length=self.max_length)['input_ids']
+        scores: List[Optional[Score]] = [None] * len(texts)
+        for batch in batch_by_tokens([len(ids) for ids in input_ids], self.batch_tokens):
+            encoded = self._tokenizer.pad({'input_ids': [input_ids[i] for i in batch]}, return_tensors='pt')
+            with torch.inference_mode():
+                probabilities = self._model(**encoded).logits.softmax(dim=-1)
+            polarity = (probabilities @ self._label_weights).tolist()
+            confidence = probabilities.max(dim=-1).values.tolist()
+            for position, index in enumerate(batch):
+                scores[index] = (polarity[position], confidence[position])
+        return scores
+
+
+SENTIMENT_BACKENDS = {
+    TextBlobBackend.name: TextBlobBackend,
+    TransformerBackend.name: TransformerBackend,
+}
+
+
+def get_sentiment_backend(name: Optional[str] = None) -> SentimentBackend:
+    name = name or settings.SENTIMENT_BACKEND
+    if name not in SENTIMENT_BACKENDS:
+        raise ValueError(f"Unknown sentiment backend: {name}")
+    return SENTIMENT_BACKENDS[name]()
@@ -0,0 +1,25 @@
+from typing import List
+from app.services.ai.lexicon_matcher import tokenize
+
+
+class TextFeatures:
+    """Per-post features computed once and shared by every detector."""
+
+    __slots__ = ('text', 'lower', 'tokens', 'letter_count', 'upper_count', 'exclamation_count')
+
+    def __init__(self, text: str):
+        self.text = text.strip()
+        self.lower = self.text.lower()
+        self.tokens: List[str] = tokenize(self.lower)
+        # filter()/map() over the str methods keep the per-character loops in C. Uppercase
+        # is counted among letters only: 'Ⅷ'.isupper() is True but it is not a letter
+        letters = ''.join(filter(str.isalpha, self.text))
+        self.letter_count = len(letters)
+        self.upper_count = sum(map(str.isupper, letters))
+        self.exclamation_count = self.text.count('!')
+
+    @property
+    def caps_ratio(self) -> float:
+        if not self.letter_count:
+            return 0.0
+        return self.upper_count / self.letter_count
@@ -0,0 +1,90 @@
+from threading import Lock
+from typing import Optional
+import os
+from fastapi import Depends, Request
+from sqlalchemy.orm import Session
+from app.core.database import get_db
+from app.services.scraping.social_media_scraper import SocialMediaScraper
+from app.services.ai.sentiment_analyzer import SentimentAnalyzer
+from app.services.ai.scoring_engine import ScoringEngine
+from app.services.screening_service import ScreeningService
+
+
+class ServiceContainer:
+    """Process-wide scraper, analyzer and scoring engine, shared by every request and job.
+
+    The instances are read-only once built (caches and the analyzer's pool are locked
+    internally), so concurrent requests can use them without copying.
+    """
+
+    def __init__(self, analyzer_workers: Optional[int] = None):
+        self.scraper = SocialMediaScraper()
+        self.sentiment_analyzer = SentimentAnalyzer()
+        self.scoring_engine = ScoringEngine()
+        if analyzer_workers:
+            # CPU share of this process: the batch pool, or torch threads for the transformer backend
+            self.sentiment_analyzer.batch_workers = analyzer_workers
+            backend = self.sentiment_analyzer.sentiment_backend
+            if getattr(backend, 'num_threads', None) == 0:
+                backend.num_threads = analyzer_workers
+
+    def warm_up(self) -> None:
+        # Loads the NLP stack and resolves lazily computed state before traffic arrives
+        self.sentiment_analyzer.warm_up()
+
+    def close(self) -> None:
+        self.sentiment_analyzer.close()
+
+
+_container: Optional[ServiceContainer] = None
+_container_pid: Optional[int] = None
+_container_lock = Lock()
+
+
+def get_service_container(analyzer_workers: Optional[int] = None) -> ServiceContainer:
+    # Rebuilt in a forked/spawned worker rather than inheriting the parent's analyzer pool;
+    # analyzer_workers only applies when the container is built by this call
+    global _container, _container_pid
+    with _container_lock:
+        if _container is None or _container_pid != os.getpid():
+            _container = ServiceContainer(analyzer_workers)
+            _container_pid = os.getpid()
+        return _container
+
+
+def close_service_container() -> None:
+    global _container
+    with _container_lock:
+        if _container is not None and _container_pid == os.getpid():
+            _container.close()
+        _container = None
+
+
+# The dependencies below are async only so FastAPI calls them on the event loop
+# instead of hopping to its threadpool; none of them block
+
+
+async def get_services(request: Request) -> ServiceContainer:
+    # Set on app.state at startup; built on first use when the app runs without its lifespan
+    services = getattr(request.app.state, 'services', None)
+    return services if services is not None else get_service_container()
+
+
+async def get_sentiment_analyzer(services: ServiceContainer = Depends(get_services)) -> SentimentAnalyzer:
+    return services.sentiment_analyzer
+
+
+async def get_scoring_engine(services: ServiceContainer = Depends(get_services)) -> ScoringEngine:
+    return services.scoring_engine
+
+
+async def get_screening_service(
+    db: Session = Depends(get_db),
+    services: ServiceContainer = Depends(get_services)
+) -> ScreeningService:
+    return ScreeningService(
+        db,
+        scraper=services.scraper,
+        sentiment_analyzer=services.sentiment_analyzer,
+        scoring_engine=services.scoring_engine
+    )
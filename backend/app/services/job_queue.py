@@ -0,0 +1,385 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Dict, List, Optional
+import multiprocessing
+import os
+import time
+import uuid
+from sqlalchemy import create_engine, func, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal, bulk_insert
+from app.core.redis import get_redis
+from app.models.job import JobStatus, ScreeningCohort, ScreeningJob
+
+SUBMIT_BATCH_SIZE = 1000
+
+
+# Sessions for job workers running in this process (thread executor); spawned worker
+# processes always start from SessionLocal
+_session_factory = SessionLocal
+
+
+def set_session_factory(factory) -> None:
+    global _session_factory
+    _session_factory = factory
+
+
+class JobProgress:
+    """Writes a job's stage/progress outside the screening's own transaction."""
+
+    MIN_INTERVAL = 0.5
+
+    def __init__(self, job_id: str, bind):
+        self.job_id = job_id
+        self.bind = bind
+        self._stage = None
+        self._last_write = 0.0
+
+    def __call__(self, stage: str, fraction: float) -> None:
+        now = time.monotonic()
+        if stage == self._stage and now - self._last_write < self.MIN_INTERVAL:
+            return
+        try:
+            with self.bind.begin() as conn:
+                conn.execute(
+                    update(ScreeningJob)
+                    .where(ScreeningJob.id == self.job_id)
+                    .values(stage=stage, progress=round(fraction, 3))
+                )
+        except OperationalError:
+            # Best effort: SQLite allows one writer, and the screening may hold it
+            return
+        self._stage = stage
+        self._last_write = now
+
+
+_sqlite_progress_engines: Dict[str, object] = {}
+_progress_lock = Lock()
+
+
+def _progress_engine(db: Session):
+    # On SQLite, give up on a locked database at once instead of waiting out the default 5s
+    bind = db.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return bind
+    url = bind.url.render_as_string(hide_password=False)
+    with _progress_lock:
+        if url not in _sqlite_progress_engines:
+            _sqlite_progress_engines[url] = create_engine(url, connect_args={'timeout': 0.05})
+        return _sqlite_progress_engines[url]
+
+
+def run_screening_job(job_id: str) -> None:
+    """Executes one queued screening job, retrying failures up to its max_attempts."""
+    from app.services.container import get_service_container
+    from app.services.screening_service import ScreeningService
+
+    db = _session_factory()
+    try:
+        job = db.get(ScreeningJob, job_id)
+        if job is None:
+            return
+        # Workers reuse one scraper/analyzer/scoring engine for every job they run
+        services = get_service_container()
+        service = ScreeningService(
+            db,
+            scraper=services.scraper,
+            sentiment_analyzer=services.sentiment_analyzer,
+            scoring_engine=services.scoring_engine
+        )
+        payload = job.payload or {}
+
+        while True:
+            if not _claim(db, job):
+                # Finished, or running elsewhere: the id was submitted again by a sweep or a retry
+                return
+
+            try:
+                result = service.conduct_screening(
+                    job.candidate_id,
+                    force_refresh=payload.get('force_refresh', False),
+                    progress=JobProgress(job_id, _progress_engine(db))
+                )
+            except ValueError as e:
+                # The candidate is gone; retrying cannot help
+                db.rollback()
+                _finish(db, job, JobStatus.FAILED, error=str(e))
+                return
+            except Exception as e:
+                db.rollback()
+                if job.attempts >= job.max_attempts:
+                    _finish(db, job, JobStatus.FAILED, error=str(e))
+                    return
+                job.status = JobStatus.RETRYING
+                job.error = str(e)
+                db.commit()
+                time.sleep(settings.JOB_RETRY_BACKOFF * 2 ** (job.attempts - 1))
+                continue
+
+            _finish(db, job, JobStatus.COMPLETED, screening_result_id=result.id)
+            return
+    finally:
+        db.close()
+
+
+def job_analyzer_workers(processes: int) -> int:
+    """Analyzer pool size for each of `processes` job processes sharing this machine's CPUs."""
+    if settings.ANALYZER_WORKERS:
+        return settings.ANALYZER_WORKERS
+    return max((os.cpu_count() or 1) // max(processes, 1), 1)
+
+
+def _init_job_process(processes: int) -> None:
+    # Without a cap every job process would start one analyzer worker per CPU
+    from app.services.container import get_service_container
+
+    get_service_container(analyzer_workers=job_analyzer_workers(processes))
+
+
+def _claim(db: Session, job: ScreeningJob) -> bool:
+    # Atomic, so of several workers handed the same id only one runs it
+    claimed = db.execute(
+        update(ScreeningJob)
+        .where(
+            ScreeningJob.id == job.id,
+            ScreeningJob.status.in_((JobStatus.QUEUED, JobStatus.RETRYING))
+        )
+        .values(
+            status=JobStatus.RUNNING,
+            attempts=ScreeningJob.attempts + 1,
+            started_at=func.coalesce(ScreeningJob.started_at, datetime.utcnow())
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    db.refresh(job)
+    return claimed == 1
+
+
+def _finish(db: Session, job: ScreeningJob, status: str, **values) -> None:
+    job.status = status
+    job.finished_at = datetime.utcnow()
+    if status == JobStatus.COMPLETED:
+        job.stage = 'done'
+        job.progress = 1.0
+        job.error = None
+    for field, value in values.items():
+        setattr(job, field, value)
+    db.commit()
+
+
+class LocalJobQueue:
+    """Runs jobs on a pool owned by the API process; used when REDIS_URL is not available."""
+
+    def __init__(self, max_workers: int, executor: str = 'process'):
+        self.max_workers = max_workers
+        self.executor_kind = executor
+        self._executor: Optional[Executor] = None
+        self._lock = Lock()
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.executor_kind == 'thread':
+                    self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='screening-job')
+                else:
+                    # spawn: the API process runs threads, which must not be forked
+                    self._executor = ProcessPoolExecutor(
+                        self.max_workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_init_job_process,
+                        initargs=(self.max_workers,)
+                    )
+            return self._executor
+
+    def submit(self, job_id: str) -> None:
+        self._get_executor().submit(run_screening_job, job_id)
+
+    def submit_many(self, job_ids: List[str]) -> None:
+        executor = self._get_executor()
+        for job_id in job_ids:
+            executor.submit(run_screening_job, job_id)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+class RedisJobQueue:
+    """Pushes job ids onto a Redis list consumed by scripts/screening_worker.py processes."""
+
+    def __init__(self, client, name: str):
+        self.client = client
+        self.name = name
+
+    def submit(self, job_id: str) -> None:
+        self.client.lpush(self.name, job_id)
+
+    def submit_many(self, job_ids: List[str]) -> None:
+        for start in range(0, len(job_ids), SUBMIT_BATCH_SIZE):
+            self.client.lpush(self.name, *job_ids[start:start + SUBMIT_BATCH_SIZE])
+
+    def shutdown(self) -> None:
+        pass
+
+
+def consume_redis_queue(poll_timeout: int = 5, processes: Optional[int] = None) -> None:
+    # Worker process loop: one job at a time, so concurrency equals the number of workers
+    client = get_redis()
+    if client is None:
+        raise RuntimeError('REDIS_URL is not set or Redis is unreachable')
+    _init_job_process(processes or settings.JOB_MAX_CONCURRENCY)
+    while True:
+        item = client.brpop(settings.JOB_QUEUE_NAME, timeout=poll_timeout)
+        if item:
+            run_screening_job(item[1].decode())
+
+
+_job_queue = None
+_job_queue_lock = Lock()
+
+
+def get_job_queue():
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            client = get_redis()
+            if client is not None:
+                _job_queue = RedisJobQueue(client, settings.JOB_QUEUE_NAME)
+            else:
+                _job_queue = LocalJobQueue(settings.JOB_MAX_CONCURRENCY, settings.JOB_LOCAL_EXECUTOR)
+        return _job_queue
+
+
+def shutdown_job_queue() -> None:
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is not None:
+            _job_queue.shutdown()
+            _job_queue = None
+
+
+def requeue_stale_jobs(db: Session, timeout: Optional[float] = None) -> Dict[str, int]:
+    """Recovers jobs left unfinished by a stopped API or worker process.
+
+    Jobs not updated for `timeout` seconds are queued again, or failed once they have
+    used up their attempts. With Redis, queued jobs are still on the list, so only jobs
+    a worker had already picked up are swept.
+    """
+    timeout = settings.JOB_STALE_TIMEOUT if timeout is None else timeout
+    queue = get_job_queue()
+    statuses = [JobStatus.RUNNING, JobStatus.RETRYING]
+    if not isinstance(queue, RedisJobQueue):
+        # The local pool died with its process, taking every queued job with it
+        statuses.append(JobStatus.QUEUED)
+    cutoff = datetime.utcnow() - timedelta(seconds=timeout)
+    jobs = db.query(ScreeningJob).filter(
+        ScreeningJob.status.in_(statuses),
+        func.coalesce(ScreeningJob.updated_at, ScreeningJob.created_at) < cutoff
+    ).all()
+
+    requeued = []
+    failed = 0
+    for job in jobs:
+        if job.attempts >= job.max_attempts:
+            job.status = JobStatus.FAILED
+            job.finished_at = datetime.utcnow()
+            job.error = job.error or 'Interrupted before finishing'
+            failed += 1
+        else:
+            job.status = JobStatus.QUEUED
+            job.stage = 'queued'
+            job.progress = 0.0
+            requeued.append(job.id)
+    db.commit()
+
+    if requeued:
+        queue.submit_many(requeued)
+    return {'requeued': len(requeued), 'failed': failed}
+
+
+def sweep_stale_jobs() -> Dict[str, int]:
+    db = _session_factory()
+    try:
+        return requeue_stale_jobs(db)
+    finally:
+        db.close()
+
+
+def _job_row(candidate_id: int, payload: Optional[Dict], cohort_id: Optional[str] = None) -> Dict:
+    return {
+        'id': uuid.uuid4().hex,
+        'candidate_id': candidate_id,
+        'cohort_id': cohort_id,
+        'payload': payload or {},
+        'status': JobStatus.QUEUED,
+        'stage': 'queued',
+        'progress': 0.0,
+        'attempts': 0,
+        'max_attempts': settings.JOB_MAX_ATTEMPTS,
+    }
+
+
+def enqueue_screening(db: Session, candidate_id: int, payload: Optional[Dict] = None) -> ScreeningJob:
+    job = ScreeningJob(**_job_row(candidate_id, payload))
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    get_job_queue().submit(job.id)
+    return job
+
+
+def enqueue_cohort(
+    db: Session,
+    candidate_ids: List[int],
+    payload: Optional[Dict] = None,
+    selection: Optional[Dict] = None,
+    name: Optional[str] = None
+) -> ScreeningCohort:
+    """Creates one job per candidate in a single transaction, then hands them all to the queue."""
+    cohort = ScreeningCohort(
+        id=uuid.uuid4().hex,
+        name=name,
+        selection=selection,
+        payload=payload or {},
+        total_jobs=len(candidate_ids),
+    )
+    db.add(cohort)
+    db.flush()
+
+    rows = [_job_row(candidate_id, payload, cohort.id) for candidate_id in candidate_ids]
+    bulk_insert(db, ScreeningJob, rows)
+    db.commit()
+    db.refresh(cohort)
+
+    get_job_queue().submit_many([row['id'] for row in rows])
+    return cohort
+
+
+def cohort_progress(db: Session, cohort: ScreeningCohort) -> Dict:
+    counts = {status: 0 for status in JobStatus.ALL}
+    progress_sum = 0.0
+    rows = db.query(
+        ScreeningJob.status, func.count(ScreeningJob.id), func.sum(ScreeningJob.progress)
+    ).filter(ScreeningJob.cohort_id == cohort.id).group_by(ScreeningJob.status).all()
+    for status, count, progress in rows:
+        counts[status] = count
+        # A failed job is finished too; count it as fully progressed
+        progress_sum += count if status in JobStatus.FINISHED else (progress or 0.0)
+
+    finished = sum(counts[status] for status in JobStatus.FINISHED)
+    return {
+        'id': cohort.id,
+        'name': cohort.name,
+        'selection': cohort.selection,
+        'total_jobs': cohort.total_jobs,
+        'counts': counts,
+        'progress': round(progress_sum / cohort.total_jobs, 4) if cohort.total_jobs else 1.0,
+        'finished': finished >= cohort.total_jobs,
+        'created_at': cohort.created_at,
+    }
@@ -0,0 +1,98 @@
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+from app.core.config import settings
+from app.services.scraping.social_media_scraper import SocialMediaScraper
+
+
+class AsyncSocialMediaScraper:
+    """Non-blocking counterpart of SocialMediaScraper with the same output schema.
+
+    A global semaphore caps in-flight platform scrapes across all candidates and a
+    per-platform semaphore keeps each platform under its own limit. Semaphores belong
+    to the event loop that first uses them.
+
+    The platform scrapers are the synchronous ones, run on worker threads: the event
+    loop stays free, but each in-flight scrape holds a thread for its whole request.
+    """
+
+    def __init__(self):
+        # Profile parsing/normalisation is shared with the sync scraper
+        self.profiles = SocialMediaScraper()
+        self.platform_timeout = self.profiles.platform_timeout
+        self.total_deadline = self.profiles.total_deadline
+
+        self._global_limit = asyncio.Semaphore(settings.SCRAPING_ASYNC_MAX_CONCURRENCY)
+        self._platform_limits = {
+            platform: asyncio.Semaphore(settings.SCRAPING_ASYNC_PLATFORM_LIMITS.get(platform, 5))
+            for platform in self.profiles.platform_scrapers
+        }
+
+        self.platform_scrapers: Dict[str, Callable[[str], Awaitable[Optional[Dict]]]] = {
+            platform: self._wrap_sync(scrape)
+            for platform, scrape in self.profiles.platform_scrapers.items()
+        }
+
+    async def scrape_candidate_profiles(
+        self,
+        linkedin_url: Optional[str] = None,
+        twitter_username: Optional[str] = None,
+        facebook_url: Optional[str] = None,
+        instagram_username: Optional[str] = None
+    ) -> List[Dict]:
+        handles = {
+            'linkedin': linkedin_url,
+            'twitter': twitter_username,
+            'facebook': facebook_url,
+            'instagram': instagram_username,
+        }
+        targets: List[Tuple[str, str]] = [
+            (platform, handles[platform]) for platform in self.platform_scrapers if handles.get(platform)
+        ]
+        if not targets:
+            return []
+
+        tasks = [asyncio.ensure_future(self._scrape_platform(platform, handle)) for platform, handle in targets]
+        _, pending = await asyncio.wait(tasks, timeout=self.total_deadline)
+        for task in pending:
+            task.cancel()
+
+        results = []
+        for (platform, handle), task in zip(targets, tasks):
+            if task in pending:
+                result = self.profiles._error_footprint(
+                    platform, handle, 'timeout', f'Scraping {platform} exceeded {self.total_deadline}s deadline'
+                )
+            else:
+                result = task.result()
+            if result:
+                results.append(result)
+        return results
+
+    async def _scrape_platform(self, platform: str, handle: str) -> Optional[Dict]:
+        try:
+            async with self._global_limit, self._platform_limits[platform]:
+                return await asyncio.wait_for(self.platform_scrapers[platform](handle), self.platform_timeout)
+        except asyncio.TimeoutError:
+            return self.profiles._error_footprint(
+                platform, handle, 'timeout', f'Scraping {platform} exceeded {self.platform_timeout}s'
+            )
+        except Exception as e:
+            return self.profiles._error_footprint(platform, handle, 'error', str(e))
+
+    def _wrap_sync(self, scrape: Callable[[str], Optional[Dict]]) -> Callable[[str], Awaitable[Optional[Dict]]]:
+        # Blocking scrapers run on the default thread pool so they overlap and never stall
+        # the loop; on timeout the thread finishes in the background and its result is dropped
+        async def run(handle: str) -> Optional[Dict]:
+            return await asyncio.to_thread(scrape, handle)
+        return run
+
+
+_async_scraper: Optional[AsyncSocialMediaScraper] = None
+
+
+def get_async_scraper() -> AsyncSocialMediaScraper:
+    # FastAPI dependency: one scraper (and set of semaphores) per worker event loop
+    global _async_scraper
+    if _async_scraper is None:
+        _async_scraper = AsyncSocialMediaScraper()
+    return _async_scraper
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.screening import DigitalFootprint
+from app.services.scraping.social_media_scraper import SocialMediaScraper, URL_PLATFORMS
+
+FOOTPRINT_FIELDS = (
+    'platform', 'profile_url', 'username', 'display_name', 'bio',
+    'follower_count', 'following_count', 'post_count', 'profile_data', 'posts_data',
+    'scraped_at', 'scraping_status', 'scraping_error', 'etag', 'last_modified', 'analysis_state',
+)
+
+
+class FootprintCache:
+    """Serves a platform from its newest stored DigitalFootprint while that is still fresh.
+
+    Fresh means scraped within the platform's FOOTPRINT_CACHE_TTL seconds. A stale row
+    carrying an ETag/Last-Modified is revalidated with a conditional request and reused
+    (with scraped_at bumped) when the platform answers 304.
+    """
+
+    def __init__(self, db: Session, scraper: SocialMediaScraper, ttls: Optional[Dict[str, int]] = None):
+        self.db = db
+        self.scraper = scraper
+        self.ttls = settings.FOOTPRINT_CACHE_TTL if ttls is None else ttls
+
+    def latest(self, candidate_id: int, handles: Dict[str, str]) -> Dict[str, DigitalFootprint]:
+        # Newest completed footprint per platform, fresh or not
+        latest = {}
+        for platform, handle in handles.items():
+            footprint = self._newest(candidate_id, platform, handle)
+            if footprint is not None:
+                latest[platform] = footprint
+        return latest
+
+    def lookup(
+        self,
+        candidate_id: int,
+        handles: Dict[str, str],
+        latest: Optional[Dict[str, DigitalFootprint]] = None
+    ) -> Dict[str, DigitalFootprint]:
+        if latest is None:
+            latest = self.latest(candidate_id, handles)
+
+        now = datetime.utcnow()
+        reusable = {}
+        for platform, footprint in latest.items():
+            handle = handles[platform]
+            ttl = self.ttls.get(platform, 0)
+            if ttl > 0 and footprint.scraped_at >= now - timedelta(seconds=ttl):
+                reusable[platform] = footprint
+            elif self.scraper.revalidate(platform, handle, footprint.etag, footprint.last_modified):
+                footprint.scraped_at = now
+                reusable[platform] = footprint
+        return reusable
+
+    def _newest(self, candidate_id: int, platform: str, handle: str) -> Optional[DigitalFootprint]:
+        query = self.db.query(DigitalFootprint).filter(
+            DigitalFootprint.candidate_id == candidate_id,
+            DigitalFootprint.platform == platform,
+            DigitalFootprint.scraping_status == 'completed',
+        )
+        # A changed handle on the candidate must not be served the old account's data
+        if platform in URL_PLATFORMS:
+            query = query.filter(DigitalFootprint.profile_url == handle)
+        else:
+            query = query.filter(DigitalFootprint.username == handle.replace('@', ''))
+        return query.order_by(DigitalFootprint.scraped_at.desc(), DigitalFootprint.id.desc()).first()
+
+    @staticmethod
+    def to_footprint_data(footprint: DigitalFootprint) -> Dict:
+        # Same shape as a SocialMediaScraper result
+        return {field: getattr(footprint, field) for field in FOOTPRINT_FIELDS}
@@ -0,0 +1,55 @@
+from threading import Lock
+from typing import Dict, Optional
+import os
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.core.config import settings
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def build_session(headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    retry = Retry(
+        total=settings.SCRAPING_MAX_RETRIES,
+        backoff_factor=settings.SCRAPING_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({'GET', 'HEAD'}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    # pool_block caps open connections per host at pool_maxsize instead of
+    # opening (and discarding) extra ones under load
+    adapter = HTTPAdapter(
+        pool_connections=settings.SCRAPING_POOL_HOSTS,
+        pool_maxsize=settings.SCRAPING_POOL_PER_HOST,
+        pool_block=True,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive',
+    })
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+_shared_session: Optional[requests.Session] = None
+_shared_session_pid: Optional[int] = None
+_shared_session_lock = Lock()
+
+
+def get_shared_session(headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    # One pool per worker process, reused by every scraper/candidate in it.
+    # A forked child rebuilds its own instead of sharing the parent's sockets.
+    global _shared_session, _shared_session_pid
+    with _shared_session_lock:
+        if _shared_session is None or _shared_session_pid != os.getpid():
+            _shared_session = build_session(headers)
+            _shared_session_pid = os.getpid()
+        return _shared_session
@@ -0,0 +1,65 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def post_key(post: Dict) -> str:
+    # The platform's post id when the scraper has one, otherwise date + text
+    if post.get('id') is not None:
+        return str(post['id'])
+    return f"{post.get('date') or ''}|{post.get('text') or ''}"
+
+
+def high_water_mark(posts: Optional[List[Dict]]) -> Optional[Dict]:
+    """Newest post date in a stored timeline plus the keys of the posts on that date."""
+    dated = [post for post in posts or [] if isinstance(post, dict) and post.get('date')]
+    if not dated:
+        return None
+    newest = max(str(post['date']) for post in dated)
+    return {
+        'date': newest,
+        'keys': [post_key(post) for post in dated if str(post['date']) == newest],
+    }
+
+
+def is_known(post: Dict, mark: Dict) -> bool:
+    date = str(post.get('date') or '')
+    if not date:
+        return False
+    return date < mark['date'] or (date == mark['date'] and post_key(post) in mark['keys'])
+
+
+def paginate_timeline(
+    fetch_page: Callable[[int], List[Dict]],
+    since: Optional[Dict],
+    max_pages: int
+) -> List[Dict]:
+    # Pages are newest first; once a page contains a post from the previous scrape,
+    # every older page is already stored and is not requested
+    posts: List[Dict] = []
+    for page in range(max_pages):
+        batch = fetch_page(page)
+        if not batch:
+            break
+        if since is None:
+            posts.extend(batch)
+            continue
+        new_posts = [post for post in batch if not is_known(post, since)]
+        posts.extend(new_posts)
+        if len(new_posts) < len(batch):
+            break
+    return posts
+
+
+def merge_posts(new_posts: List[Dict], known_posts: Optional[List[Dict]]) -> Tuple[List[Dict], List[Dict]]:
+    """Returns (merged timeline, posts not already stored); new posts go first."""
+    known_posts = [post for post in known_posts or [] if isinstance(post, dict)]
+    seen = {post_key(post) for post in known_posts}
+
+    added = []
+    for post in new_posts:
+        if not isinstance(post, dict):
+            continue
+        key = post_key(post)
+        if key not in seen:
+            seen.add(key)
+            added.append(post)
+    return added + known_posts, added
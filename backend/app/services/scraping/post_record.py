@@ -0,0 +1,48 @@
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+
+@dataclass(frozen=True, slots=True)
+class PostRecord:
+    """One piece of scraped text with the footprint it came from."""
+
+    platform: str
+    text: str
+    post_id: Optional[str] = None
+    url: Optional[str] = None
+    date: Optional[str] = None
+    content_type: str = 'post'
+
+
+def post_records(footprint: Dict, posts: Optional[List[Dict]] = None) -> Iterator[PostRecord]:
+    # posts defaults to the footprint's whole timeline; pass a subset (e.g. only new posts) to narrow it
+    platform = footprint.get('platform', 'unknown')
+    profile_url = footprint.get('profile_url')
+    if posts is None:
+        posts = footprint.get('posts_data') or []
+    if not isinstance(posts, list):
+        return
+
+    for post in posts:
+        if isinstance(post, dict) and 'text' in post:
+            post_id = post.get('id')
+            yield PostRecord(
+                platform=platform,
+                text=post['text'],
+                post_id=str(post_id) if post_id is not None else None,
+                # Posts without their own link point at the profile they were found on
+                url=post.get('url') or profile_url,
+                date=post.get('date'),
+            )
+
+
+def bio_record(footprint: Dict) -> Optional[PostRecord]:
+    bio = footprint.get('bio')
+    if not bio:
+        return None
+    return PostRecord(
+        platform=footprint.get('platform', 'unknown'),
+        text=bio,
+        url=footprint.get('profile_url'),
+        content_type='bio',
+    )
@@ -0,0 +1,183 @@
+from threading import Lock, local
+from typing import Dict, Optional
+import asyncio
+import os
+import sqlite3
+import time
+from app.core.config import settings
+from app.core.redis import get_redis
+
+
+class RateLimitTimeout(Exception):
+    pass
+
+
+class SQLiteBucketStore:
+    """Token buckets in a SQLite file; BEGIN IMMEDIATE serialises workers on the same host."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._connection().execute(
+            'CREATE TABLE IF NOT EXISTS rate_buckets ('
+            ' name TEXT PRIMARY KEY,'
+            ' tokens REAL NOT NULL,'
+            ' updated_at REAL NOT NULL)'
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, name: str, rate: float, capacity: float, consume: bool) -> float:
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            row = conn.execute('SELECT tokens, updated_at FROM rate_buckets WHERE name = ?', (name,)).fetchone()
+            tokens, updated_at = row if row else (capacity, now)
+            tokens = min(capacity, tokens + max(0.0, now - updated_at) * rate)
+
+            wait = 0.0
+            if tokens >= 1:
+                if consume:
+                    tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+
+            if consume:
+                conn.execute(
+                    'INSERT OR REPLACE INTO rate_buckets (name, tokens, updated_at) VALUES (?, ?, ?)',
+                    (name, tokens, now)
+                )
+            conn.execute('COMMIT')
+            return wait
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+
+# Same refill arithmetic as SQLiteBucketStore.take, run atomically on the Redis server
+# using its clock so workers on different hosts agree on elapsed time
+_REDIS_TAKE = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local consume = ARGV[3] == '1'
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local wait = 0
+if tokens >= 1 then
+    if consume then tokens = tokens - 1 end
+else
+    wait = (1 - tokens) / rate
+end
+if consume then
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+    redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+end
+return tostring(wait)
+"""
+
+
+class RedisBucketStore:
+    """Token buckets shared by every worker and host pointed at the same Redis."""
+
+    KEY_PREFIX = 'ratelimit:'
+
+    def __init__(self, client):
+        self.client = client
+        self._script = client.register_script(_REDIS_TAKE)
+
+    def take(self, name: str, rate: float, capacity: float, consume: bool) -> float:
+        wait = self._script(keys=[self.KEY_PREFIX + name], args=[rate, capacity, 1 if consume else 0])
+        return float(wait)
+
+
+class RateLimiter:
+    """Per-platform token buckets: `SCRAPING_RATE_LIMITS` requests per minute, bursting to `SCRAPING_RATE_BURST`."""
+
+    def __init__(self, limits: Dict[str, float], burst: int, store=None):
+        self.limits = limits
+        self.burst = max(1, burst)
+        self._store = store
+        self._store_lock = Lock()
+
+    @property
+    def store(self):
+        # Created on first use so importing/constructing a scraper touches neither Redis nor disk
+        if self._store is None:
+            with self._store_lock:
+                if self._store is None:
+                    self._store = _build_store()
+        return self._store
+
+    def _bucket(self, platform: str):
+        per_minute = self.limits.get(platform) or 0
+        return per_minute / 60.0, float(self.burst)
+
+    def try_acquire(self, platform: str) -> float:
+        # 0.0 when a token was taken, otherwise seconds until one will be available
+        rate, capacity = self._bucket(platform)
+        if rate <= 0:
+            return 0.0
+        return self.store.take(platform, rate, capacity, consume=True)
+
+    def expected_wait(self, platform: str) -> float:
+        rate, capacity = self._bucket(platform)
+        if rate <= 0:
+            return 0.0
+        return self.store.take(platform, rate, capacity, consume=False)
+
+    def acquire(self, platform: str, timeout: Optional[float] = None) -> None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(platform)
+            if wait <= 0:
+                return
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise RateLimitTimeout(f'Rate limit for {platform} would exceed {timeout}s')
+            time.sleep(wait)
+
+    async def acquire_async(self, platform: str, timeout: Optional[float] = None) -> None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            # The store blocks (SQLite lock waits, Redis round trips, building it on first
+            # use), so it runs on a thread rather than stalling the event loop
+            wait = await asyncio.to_thread(self.try_acquire, platform)
+            if wait <= 0:
+                return
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise RateLimitTimeout(f'Rate limit for {platform} would exceed {timeout}s')
+            await asyncio.sleep(wait)
+
+
+def _build_store():
+    client = get_redis()
+    if client is not None:
+        return RedisBucketStore(client)
+    return SQLiteBucketStore(settings.SCRAPING_RATE_LIMIT_DB_PATH)
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(settings.SCRAPING_RATE_LIMITS, settings.SCRAPING_RATE_BURST)
+        return _rate_limiter
@@ -1,52 +1,175 @@
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import requests
 from bs4 import BeautifulSoup
 import time
 import json
 from datetime import datetime
 from app.core.config import settings
+from app.services.scraping.http_session import get_shared_session
+from app.services.scraping.incremental import paginate_timeline
+from app.services.scraping.post_record import PostRecord, bio_record, post_records
+from app.services.scraping.rate_limiter import get_rate_limiter
+
+# Platforms addressed by profile URL; the others take a username
+URL_PLATFORMS = {'linkedin', 'facebook'}
+MOCK_PAGE_SIZE = 20
+# scrape_candidate_profiles keyword (and Candidate column) holding each platform's handle
+HANDLE_FIELDS = {
+    'linkedin': 'linkedin_url',
+    'twitter': 'twitter_username',
+    'facebook': 'facebook_url',
+    'instagram': 'instagram_username',
+}
 
 
 class SocialMediaScraper:
     def __init__(self):
         self.timeout = settings.SCRAPING_TIMEOUT
         self.max_pages = settings.MAX_SCRAPING_PAGES
+        self.concurrent = settings.SCRAPING_CONCURRENT
+        self.platform_timeout = settings.SCRAPING_PLATFORM_TIMEOUT or settings.SCRAPING_TIMEOUT
+        self.total_deadline = settings.SCRAPING_TOTAL_DEADLINE
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        self.session = get_shared_session(self.headers)
+        self.rate_limiter = get_rate_limiter()
+        # Results are always returned in this order, whatever order fetches finish in
+        self.platform_scrapers: Dict[str, Callable[[str], Optional[Dict]]] = {
+            'linkedin': self._scrape_linkedin_mock,
+            'twitter': self._scrape_twitter_mock,
+            'facebook': self._scrape_facebook_mock,
+            'instagram': self._scrape_instagram_mock,
+        }
+        # Platforms whose profile endpoint honours ETag/Last-Modified register a
+        # (handle, etag, last_modified) -> not-modified check here
+        self.platform_revalidators: Dict[str, Callable[[str, Optional[str], Optional[str]], bool]] = {}
 
     def scrape_candidate_profiles(
         self,
         linkedin_url: Optional[str] = None,
         twitter_username: Optional[str] = None,
         facebook_url: Optional[str] = None,
-        instagram_username: Optional[str] = None
+        instagram_username: Optional[str] = None,
+        concurrent: Optional[bool] = None,
+        since: Optional[Dict[str, Dict]] = None
     ) -> List[Dict]:
-        results = []
-        
-        if linkedin_url:
-            linkedin_data = self._scrape_linkedin_mock(linkedin_url)
-            if linkedin_data:
-                results.append(linkedin_data)
-        
-        if twitter_username:
-            twitter_data = self._scrape_twitter_mock(twitter_username)
-            if twitter_data:
-                results.append(twitter_data)
-        
-        if facebook_url:
-            facebook_data = self._scrape_facebook_mock(facebook_url)
-            if facebook_data:
-                results.append(facebook_data)
-        
-        if instagram_username:
-            instagram_data = self._scrape_instagram_mock(instagram_username)
-            if instagram_data:
-                results.append(instagram_data)
-        
+        # since: per-platform high-water marks (incremental.high_water_mark of the stored
+        # posts); those platforms return only posts newer than the mark in posts_data
+        handles = {
+            'linkedin': linkedin_url,
+            'twitter': twitter_username,
+            'facebook': facebook_url,
+            'instagram': instagram_username,
+        }
+        since = since or {}
+        targets = [
+            (platform, handles[platform], since.get(platform))
+            for platform in self.platform_scrapers if handles.get(platform)
+        ]
+
+        if concurrent is None:
+            concurrent = self.concurrent
+        if concurrent and len(targets) > 1:
+            results = self._scrape_concurrently(targets)
+        else:
+            results = self._scrape_serially(targets)
+
+        return [result for result in results if result]
+
+    def fetch(self, url: str, platform: Optional[str] = None, **kwargs) -> requests.Response:
+        # Passing the platform spends one of its rate-limit tokens first
+        if platform:
+            self.rate_limiter.acquire(platform, timeout=self.platform_timeout)
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def revalidate(self, platform: str, handle: str, etag: Optional[str], last_modified: Optional[str]) -> bool:
+        # True only when the platform confirmed the stored copy is still current
+        revalidator = self.platform_revalidators.get(platform)
+        if revalidator is None or not (etag or last_modified):
+            return False
+        try:
+            return revalidator(handle, etag, last_modified)
+        except Exception:
+            return False
+
+    def is_not_modified(
+        self, url: str, platform: str, etag: Optional[str] = None, last_modified: Optional[str] = None
+    ) -> bool:
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return self.fetch(url, platform=platform, headers=headers).status_code == 304
+
+    def _scrape_platform(self, platform: str, handle: str, since: Optional[Dict]) -> Optional[Dict]:
+        # since is only passed when set, so scrapers without incremental support keep a (handle) signature
+        scrape = self.platform_scrapers[platform]
+        return scrape(handle, since=since) if since else scrape(handle)
+
+    def _scrape_serially(self, targets: List[Tuple[str, str, Optional[Dict]]]) -> List[Optional[Dict]]:
+        # Platforms that can go now run first, so a throttled one waits while the others fetch
+        order = range(len(targets))
+        if len(targets) > 1:
+            order = sorted(order, key=lambda i: self.rate_limiter.expected_wait(targets[i][0]))
+        results: List[Optional[Dict]] = [None] * len(targets)
+        for i in order:
+            results[i] = self._scrape_platform(*targets[i])
         return results
 
-    def _scrape_linkedin_mock(self, url: str) -> Optional[Dict]:
+    def _scrape_concurrently(self, targets: List[Tuple[str, str, Optional[Dict]]]) -> List[Optional[Dict]]:
+        started = time.monotonic()
+        deadline = started + self.total_deadline
+        executor = ThreadPoolExecutor(max_workers=len(targets), thread_name_prefix='scraper')
+        try:
+            futures = [
+                executor.submit(self._scrape_platform, *target)
+                for target in targets
+            ]
+
+            results: List[Optional[Dict]] = []
+            for (platform, handle, _), future in zip(targets, futures):
+                # Every fetch started at `started`, so each gets its own timeout from
+                # that point, capped by the deadline shared across all platforms
+                wait = min(started + self.platform_timeout, deadline) - time.monotonic()
+                try:
+                    results.append(future.result(timeout=max(wait, 0)))
+                except FutureTimeoutError:
+                    future.cancel()
+                    results.append(self._error_footprint(
+                        platform, handle, 'timeout',
+                        f'Scraping {platform} exceeded {min(self.platform_timeout, self.total_deadline)}s'
+                    ))
+                except Exception as e:
+                    results.append(self._error_footprint(platform, handle, 'error', str(e)))
+            return results
+        finally:
+            # Do not block the caller on fetches that already timed out
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _timeline(self, posts: List[Dict], since: Optional[Dict]) -> List[Dict]:
+        # Serves the canned posts as MOCK_PAGE_SIZE pages, newest first
+        return paginate_timeline(
+            lambda page: posts[page * MOCK_PAGE_SIZE:(page + 1) * MOCK_PAGE_SIZE], since, self.max_pages
+        )
+
+    def _error_footprint(self, platform: str, handle: str, status: str, error: str) -> Dict:
+        footprint = {
+            'platform': platform,
+            'scraped_at': datetime.utcnow(),
+            'scraping_status': status,
+            'scraping_error': error
+        }
+        if platform in URL_PLATFORMS:
+            footprint['profile_url'] = handle
+        else:
+            footprint['username'] = handle.replace('@', '')
+        return footprint
+
+    def _scrape_linkedin_mock(self, url: str, since: Optional[Dict] = None) -> Optional[Dict]:
         try:
             username = url.split('/')[-1] if '/' in url else url
             
@@ -76,7 +199,7 @@ class SocialMediaScraper:
                     ],
                     'skills': ['Public Policy', 'Digital Government', 'Leadership', 'Data Analysis']
                 },
-                'posts_data': [
+                'posts_data': self._timeline([
                     {
                         'text': 'Excited to contribute to digital transformation in public sector. Innovation and integrity are key.',
                         'date': '2024-01-15',
@@ -95,7 +218,7 @@ class SocialMediaScraper:
                         'likes': 67,
                         'comments': 12
                     }
-                ],
+                ], since),
                 'scraped_at': datetime.utcnow(),
                 'scraping_status': 'completed'
             }
@@ -108,7 +231,7 @@ class SocialMediaScraper:
                 'scraping_error': str(e)
             }
 
-    def _scrape_twitter_mock(self, username: str) -> Optional[Dict]:
+    def _scrape_twitter_mock(self, username: str, since: Optional[Dict] = None) -> Optional[Dict]:
         try:
             username = username.replace('@', '')
             
@@ -126,7 +249,7 @@ class SocialMediaScraper:
                     'location': 'Jakarta, Indonesia',
                     'joined_date': '2020-03-15'
                 },
-                'posts_data': [
+                'posts_data': self._timeline([
                     {
                         'text': 'Pagi yang produktif! Semangat untuk melayani masyarakat dengan sepenuh hati.',
                         'date': '2024-01-16',
@@ -155,7 +278,7 @@ class SocialMediaScraper:
                         'retweets': 6,
                         'replies': 9
                     }
-                ],
+                ], since),
                 'scraped_at': datetime.utcnow(),
                 'scraping_status': 'completed'
             }
@@ -168,7 +291,7 @@ class SocialMediaScraper:
                 'scraping_error': str(e)
             }
 
-    def _scrape_facebook_mock(self, url: str) -> Optional[Dict]:
+    def _scrape_facebook_mock(self, url: str, since: Optional[Dict] = None) -> Optional[Dict]:
         try:
             username = url.split('/')[-1] if '/' in url else url
             
@@ -186,7 +309,7 @@ class SocialMediaScraper:
                     'work': 'Government Institution',
                     'education': 'State University'
                 },
-                'posts_data': [
+                'posts_data': self._timeline([
                     {
                         'text': 'Alhamdulillah, program pelayanan digital kami mendapat apresiasi positif dari masyarakat. Terima kasih atas dukungannya!',
                         'date': '2024-01-15',
@@ -208,7 +331,7 @@ class SocialMediaScraper:
                         'comments': 8,
                         'shares': 3
                     }
-                ],
+                ], since),
                 'scraped_at': datetime.utcnow(),
                 'scraping_status': 'completed'
             }
@@ -221,7 +344,7 @@ class SocialMediaScraper:
                 'scraping_error': str(e)
             }
 
-    def _scrape_instagram_mock(self, username: str) -> Optional[Dict]:
+    def _scrape_instagram_mock(self, username: str, since: Optional[Dict] = None) -> Optional[Dict]:
         try:
             username = username.replace('@', '')
             
@@ -239,7 +362,7 @@ class SocialMediaScraper:
                     'private': False,
                     'posts': 189
                 },
-                'posts_data': [
+                'posts_data': self._timeline([
                     {
                         'text': 'Pagi yang indah untuk memulai hari dengan semangat baru! #PublicService #Indonesia',
                         'date': '2024-01-16',
@@ -258,7 +381,7 @@ class SocialMediaScraper:
                         'likes': 456,
                         'comments': 34
                     }
-                ],
+                ], since),
                 'scraped_at': datetime.utcnow(),
                 'scraping_status': 'completed'
             }
@@ -271,18 +394,12 @@ class SocialMediaScraper:
                 'scraping_error': str(e)
             }
 
-    def extract_posts_text(self, footprints: List[Dict]) -> List[str]:
-        all_texts = []
-        
+    def extract_post_records(self, footprints: List[Dict]) -> Iterator[PostRecord]:
         for footprint in footprints:
-            posts_data = footprint.get('posts_data', [])
-            if isinstance(posts_data, list):
-                for post in posts_data:
-                    if isinstance(post, dict) and 'text' in post:
-                        all_texts.append(post['text'])
-            
-            bio = footprint.get('bio')
+            yield from post_records(footprint)
+            bio = bio_record(footprint)
             if bio:
-                all_texts.append(bio)
-        
-        return all_texts
+                yield bio
+
+    def extract_posts_text(self, footprints: List[Dict]) -> List[str]:
+        return [record.text for record in self.extract_post_records(footprints)]
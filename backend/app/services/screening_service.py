@@ -1,118 +1,338 @@
-from typing import Dict, List
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import insert, literal, select, update
 from sqlalchemy.orm import Session
+from app.core.database import bulk_insert
 from app.models.candidate import Candidate
 from app.models.screening import ScreeningResult, DigitalFootprint, SentimentAnalysis
-from app.services.scraping.social_media_scraper import SocialMediaScraper
+from app.services.scraping.social_media_scraper import SocialMediaScraper, HANDLE_FIELDS
+from app.services.scraping.footprint_cache import FootprintCache
+from app.services.scraping.incremental import high_water_mark, merge_posts
+from app.services.scraping.post_record import PostRecord, bio_record, post_records
 from app.services.ai.sentiment_analyzer import SentimentAnalyzer
+from app.services.ai.sentiment_aggregator import SentimentAggregator
 from app.services.ai.scoring_engine import ScoringEngine
+from app.core.config import settings
 from datetime import datetime
 
 
+# ScreeningResult columns copied straight from a ScoringEngine result
+SCORE_FIELDS = (
+    'overall_score', 'technical_score', 'social_score', 'digital_ethics_score',
+    'professionalism_score', 'sentiment_score', 'positive_content_ratio',
+    'negative_content_ratio', 'neutral_content_ratio', 'recommendation',
+    'recommendation_reason', 'risk_flags', 'positive_indicators',
+)
+
+
+def _chunked(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
 class ScreeningService:
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        scraper: Optional[SocialMediaScraper] = None,
+        sentiment_analyzer: Optional[SentimentAnalyzer] = None,
+        scoring_engine: Optional[ScoringEngine] = None
+    ):
+        # Long-lived callers (job workers) pass shared instances so the analyzer's
+        # worker pool and caches survive from one candidate to the next
         self.db = db
-        self.scraper = SocialMediaScraper()
-        self.sentiment_analyzer = SentimentAnalyzer()
-        self.scoring_engine = ScoringEngine()
+        self.scraper = scraper or SocialMediaScraper()
+        self.sentiment_analyzer = sentiment_analyzer or SentimentAnalyzer()
+        self.scoring_engine = scoring_engine or ScoringEngine()
+        self.footprint_cache = FootprintCache(db, self.scraper)
+        self.chunk_size = settings.SCREENING_CHUNK_SIZE
 
-    def conduct_screening(self, candidate_id: int) -> ScreeningResult:
+    def conduct_screening(
+        self,
+        candidate_id: int,
+        force_refresh: bool = False,
+        progress: Optional[Callable[[str, float], None]] = None
+    ) -> ScreeningResult:
+        # progress(stage, fraction) is called as the screening moves through its stages
+        report = progress or (lambda stage, fraction: None)
         candidate = self.db.query(Candidate).filter(Candidate.id == candidate_id).first()
         if not candidate:
             raise ValueError(f"Candidate with id {candidate_id} not found")
-        
-        footprints_data = self.scraper.scrape_candidate_profiles(
-            linkedin_url=candidate.linkedin_url,
-            twitter_username=candidate.twitter_username,
-            facebook_url=candidate.facebook_url,
-            instagram_username=candidate.instagram_username
-        )
-        
-        digital_footprints = []
-        for footprint_data in footprints_data:
-            footprint = DigitalFootprint(
-                candidate_id=candidate_id,
-                platform=footprint_data.get('platform'),
-                profile_url=footprint_data.get('profile_url'),
-                username=footprint_data.get('username'),
-                display_name=footprint_data.get('display_name'),
-                bio=footprint_data.get('bio'),
-                follower_count=footprint_data.get('follower_count'),
-                following_count=footprint_data.get('following_count'),
-                post_count=footprint_data.get('post_count'),
-                profile_data=footprint_data.get('profile_data'),
-                posts_data=footprint_data.get('posts_data'),
-                scraped_at=footprint_data.get('scraped_at', datetime.utcnow()),
-                scraping_status=footprint_data.get('scraping_status', 'completed'),
-                scraping_error=footprint_data.get('scraping_error')
-            )
-            self.db.add(footprint)
-            digital_footprints.append(footprint_data)
-        
-        self.db.commit()
-        
-        posts_text = self.scraper.extract_posts_text(footprints_data)
-        
-        content_analyses = self.sentiment_analyzer.analyze_batch(posts_text)
-        
-        sentiment_data = self.sentiment_analyzer.calculate_aggregate_sentiment(content_analyses)
-        
-        scoring_result = self.scoring_engine.calculate_overall_score(
-            sentiment_data=sentiment_data,
-            digital_footprints=digital_footprints,
-            content_analyses=content_analyses
+
+        handles = {
+            platform: getattr(candidate, field)
+            for platform, field in HANDLE_FIELDS.items()
+            if getattr(candidate, field)
+        }
+        latest = {} if force_refresh else self.footprint_cache.latest(candidate_id, handles)
+        cached = self.footprint_cache.lookup(candidate_id, handles, latest)
+
+        # Stale platforms only fetch posts newer than their stored timeline
+        marks = {}
+        for platform, footprint in latest.items():
+            mark = high_water_mark(footprint.posts_data) if platform not in cached else None
+            if mark:
+                marks[platform] = mark
+
+        report('scraping', 0.05)
+        scraped_data = []
+        if len(cached) < len(handles):
+            scraped_data = self.scraper.scrape_candidate_profiles(since=marks, **{
+                HANDLE_FIELDS[platform]: handle
+                for platform, handle in handles.items()
+                if platform not in cached
+            })
+
+        # A stale platform whose refresh failed keeps serving its stored footprint
+        # instead of being replaced by the failed attempt
+        reused = dict(cached)
+        completed = []
+        for footprint_data in scraped_data:
+            platform = footprint_data.get('platform')
+            if footprint_data.get('scraping_status', 'completed') != 'completed' and platform in latest:
+                reused[platform] = latest[platform]
+            else:
+                completed.append(footprint_data)
+        scraped_data = completed
+
+        # (footprint, aggregator state it builds on, posts not yet in that state)
+        by_platform = {}
+        for footprint_data in scraped_data:
+            platform = footprint_data.get('platform')
+            posts = footprint_data.get('posts_data') or []
+            if platform in marks and footprint_data.get('scraping_status', 'completed') == 'completed':
+                prior = latest[platform]
+                footprint_data['posts_data'], added = merge_posts(posts, prior.posts_data)
+                by_platform[platform] = (footprint_data, prior.analysis_state, added)
+            else:
+                by_platform[platform] = (footprint_data, None, posts)
+        for platform, footprint in reused.items():
+            by_platform[platform] = (self.footprint_cache.to_footprint_data(footprint), footprint.analysis_state, [])
+
+        # Cached and freshly scraped platforms, in the scraper's platform order. Each
+        # platform's aggregator starts from its stored state when that is still valid
+        version = self.sentiment_analyzer.version
+        work = []
+        resumed = {}
+        for platform in handles:
+            if platform not in by_platform:
+                continue
+            footprint_data, state, new_posts = by_platform[platform]
+            # A state is only resumed when the screening that wrote it is known, since
+            # that screening holds the per-post rows of every post already in the state
+            if state and state.get('version') == version and state.get('screening_result_id'):
+                aggregator = SentimentAggregator.from_state(state)
+                resumed[platform] = state['screening_result_id']
+            else:
+                aggregator = SentimentAggregator(version)
+                new_posts = footprint_data.get('posts_data') or []
+            work.append((footprint_data, aggregator, new_posts))
+        footprints_data = [footprint_data for footprint_data, _, _ in work]
+
+        # Created first so per-post rows can reference it while they stream in;
+        # scores are filled in once every post has been aggregated
+        screening_result = ScreeningResult(candidate_id=candidate_id, analyzed_at=datetime.utcnow())
+        self.db.add(screening_result)
+        self.db.flush()
+
+        # Posts already in a resumed state are not re-analysed; their rows are copied
+        # from the earlier screening so every result lists all of its posts
+        for platform, prior_result_id in resumed.items():
+            self._copy_post_rows(prior_result_id, screening_result.id, platform)
+
+        # Posts flow through in chunks: analysed, added to their platform's running
+        # aggregate and bulk-inserted as SentimentAnalysis rows, so no step holds the full set
+        bio_aggregator = SentimentAggregator(version)
+        pending = self._iter_pending_posts(work, bio_aggregator)
+        pending_total = sum(len(posts) for _, _, posts in work) + len(work)
+        analysed = 0
+        report('analysing', 0.3)
+        for chunk in _chunked(pending, self.chunk_size):
+            analyses = self.sentiment_analyzer.analyze_posts([post.text for post, _ in chunk])
+            records = []
+            for (post, aggregator), analysis in zip(chunk, analyses):
+                aggregator.add((analysis,))
+                records.append({
+                    'screening_result_id': screening_result.id,
+                    'platform': post.platform,
+                    'content_type': post.content_type,
+                    'content_text': post.text[:1000],
+                    'content_url': post.url[:500] if post.url else None,
+                    'sentiment_label': analysis.sentiment_label,
+                    'sentiment_score': analysis.sentiment_score,
+                    'confidence': analysis.confidence,
+                    'contains_profanity': analysis.contains_profanity,
+                    'contains_hate_speech': analysis.contains_hate_speech,
+                    'contains_political_content': analysis.contains_political_content,
+                    'keywords': list(analysis.keywords),
+                    'analyzed_at': datetime.utcnow(),
+                })
+            bulk_insert(self.db, SentimentAnalysis, records)
+            analysed += len(chunk)
+            report('analysing', 0.3 + 0.6 * min(analysed / max(pending_total, 1), 1.0))
+
+        total = SentimentAggregator(version)
+        for footprint_data, aggregator, _ in work:
+            state = aggregator.to_state()
+            state['screening_result_id'] = screening_result.id
+            footprint_data['analysis_state'] = state
+            total.merge(aggregator)
+        total.merge(bio_aggregator)
+        for platform, footprint in reused.items():
+            footprint.analysis_state = by_platform[platform][0]['analysis_state']
+
+        bulk_insert(self.db, DigitalFootprint, [
+            {
+                'candidate_id': candidate_id,
+                'platform': footprint_data.get('platform'),
+                'profile_url': footprint_data.get('profile_url'),
+                'username': footprint_data.get('username'),
+                'display_name': footprint_data.get('display_name'),
+                'bio': footprint_data.get('bio'),
+                'follower_count': footprint_data.get('follower_count'),
+                'following_count': footprint_data.get('following_count'),
+                'post_count': footprint_data.get('post_count'),
+                'profile_data': footprint_data.get('profile_data'),
+                'posts_data': footprint_data.get('posts_data'),
+                'scraped_at': footprint_data.get('scraped_at', datetime.utcnow()),
+                'scraping_status': footprint_data.get('scraping_status', 'completed'),
+                'scraping_error': footprint_data.get('scraping_error'),
+                'etag': footprint_data.get('etag'),
+                'last_modified': footprint_data.get('last_modified'),
+                'analysis_state': footprint_data.get('analysis_state'),
+            }
+            for footprint_data in scraped_data
+        ])
+
+        report('scoring', 0.9)
+        sentiment_data = total.sentiment_data()
+        scoring_features = self.scoring_engine.extract_features_from_totals(
+            sentiment_data, footprints_data, total.content_totals()
         )
-        
-        screening_result = ScreeningResult(
-            candidate_id=candidate_id,
-            overall_score=scoring_result['overall_score'],
-            technical_score=scoring_result['technical_score'],
-            social_score=scoring_result['social_score'],
-            digital_ethics_score=scoring_result['digital_ethics_score'],
-            professionalism_score=scoring_result['professionalism_score'],
-            sentiment_score=scoring_result['sentiment_score'],
-            positive_content_ratio=scoring_result['positive_content_ratio'],
-            negative_content_ratio=scoring_result['negative_content_ratio'],
-            neutral_content_ratio=scoring_result['neutral_content_ratio'],
-            recommendation=scoring_result['recommendation'],
-            recommendation_reason=scoring_result['recommendation_reason'],
-            risk_flags=scoring_result['risk_flags'],
-            positive_indicators=scoring_result['positive_indicators'],
-            ai_analysis_summary=self._generate_summary(scoring_result),
-            detailed_report=self._generate_detailed_report(
-                candidate, footprints_data, sentiment_data, scoring_result
-            ),
-            analyzed_at=datetime.utcnow()
+        scoring_result = self.scoring_engine.score_features(sentiment_data, footprints_data, scoring_features)
+
+        for field in SCORE_FIELDS:
+            setattr(screening_result, field, scoring_result[field])
+        screening_result.ai_analysis_summary = self._generate_summary(scoring_result)
+        screening_result.detailed_report = self._generate_detailed_report(
+            candidate, footprints_data, sentiment_data, scoring_result
         )
-        
-        self.db.add(screening_result)
-        self.db.commit()
-        self.db.refresh(screening_result)
-        
-        for i, (text, analysis) in enumerate(zip(posts_text, content_analyses)):
-            platform = self._determine_platform_for_text(text, footprints_data)
-            sentiment_record = SentimentAnalysis(
-                screening_result_id=screening_result.id,
-                platform=platform,
-                content_type='post',
-                content_text=text[:1000],
-                sentiment_label=analysis['sentiment_label'],
-                sentiment_score=analysis['sentiment_score'],
-                confidence=analysis['confidence'],
-                contains_profanity=analysis['contains_profanity'],
-                contains_hate_speech=analysis['contains_hate_speech'],
-                contains_political_content=analysis['contains_political_content'],
-                keywords=analysis.get('keywords', []),
-                analyzed_at=datetime.utcnow()
-            )
-            self.db.add(sentiment_record)
-        
-        self.db.commit()
-        
+        screening_result.sentiment_data = sentiment_data
+        screening_result.engagement_insights = scoring_result['insights']['engagement']
+        screening_result.scoring_features = scoring_features
+
         candidate.status = f"screened_{scoring_result['recommendation']}"
         self.db.commit()
+        self.db.refresh(screening_result)
         
         return screening_result
 
+    def _copy_post_rows(self, from_result_id: int, to_result_id: int, platform: str) -> None:
+        # INSERT ... SELECT, so stored rows are copied by the database without loading them
+        table = SentimentAnalysis.__table__
+        columns = [column for column in table.columns if column.name not in ('id', 'screening_result_id')]
+        source = select(literal(to_result_id), *columns).where(
+            table.c.screening_result_id == from_result_id,
+            table.c.platform == platform,
+            table.c.content_type == 'post',
+        ).order_by(table.c.id)
+        self.db.execute(insert(table).from_select(
+            ['screening_result_id'] + [column.name for column in columns], source
+        ))
+
+    def _iter_pending_posts(
+        self, work: List[Tuple[Dict, SentimentAggregator, List[Dict]]], bio_aggregator: SentimentAggregator
+    ) -> Iterator[Tuple[PostRecord, SentimentAggregator]]:
+        # (post, aggregator it feeds) for every post not yet in a stored state
+        for footprint_data, aggregator, posts in work:
+            for post in post_records(footprint_data, posts):
+                yield post, aggregator
+
+        # Bios are re-read on every scrape, so they are analysed each run and kept out of the stored states
+        for footprint_data, _, _ in work:
+            bio = bio_record(footprint_data)
+            if bio:
+                yield bio, bio_aggregator
+
+    def rescore_results(self, batch_size: int = 500, candidate_ids: Optional[List[int]] = None) -> Dict:
+        # Streams screening_results in id order (keyset pagination) and recomputes
+        # scores, flags and recommendations from the stored aggregates only
+        rescored = 0
+        skipped = 0
+        last_id = 0
+
+        while True:
+            query = self.db.query(ScreeningResult).filter(ScreeningResult.id > last_id)
+            if candidate_ids:
+                query = query.filter(ScreeningResult.candidate_id.in_(candidate_ids))
+            rows = query.order_by(ScreeningResult.id).limit(batch_size).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            rescorable = [
+                row for row in rows
+                if row.sentiment_data is not None and row.scoring_features is not None
+            ]
+            skipped += len(rows) - len(rescorable)
+
+            scoring_results = self.scoring_engine.rescore_aggregates([
+                {
+                    'sentiment_data': row.sentiment_data,
+                    'engagement_insights': row.engagement_insights or {},
+                    'scoring_features': row.scoring_features,
+                }
+                for row in rescorable
+            ])
+
+            # Rows come in id order, so the last write per candidate is its latest result
+            latest_status: Dict[int, str] = {}
+            for row, scoring_result in zip(rescorable, scoring_results):
+                self._apply_scoring_result(row, scoring_result)
+                latest_status[row.candidate_id] = f"screened_{scoring_result['recommendation']}"
+
+            for status in set(latest_status.values()):
+                ids = [cid for cid, value in latest_status.items() if value == status]
+                self.db.execute(update(Candidate).where(Candidate.id.in_(ids)).values(status=status))
+
+            self.db.commit()
+            self.db.expunge_all()
+            rescored += len(rescorable)
+
+        return {'rescored': rescored, 'skipped': skipped}
+
+    def _apply_scoring_result(self, screening_result: ScreeningResult, scoring_result: Dict) -> None:
+        for field in SCORE_FIELDS:
+            setattr(screening_result, field, scoring_result[field])
+        screening_result.ai_analysis_summary = self._generate_summary(scoring_result)
+
+        report = dict(screening_result.detailed_report or {})
+        report.update({
+            'scores': {
+                'overall': scoring_result['overall_score'],
+                'breakdown': {
+                    'digital_ethics': scoring_result['digital_ethics_score'],
+                    'professionalism': scoring_result['professionalism_score'],
+                    'sentiment': scoring_result['sentiment_score'],
+                    'social': scoring_result['social_score']
+                }
+            },
+            'recommendation': {
+                'status': scoring_result['recommendation'],
+                'confidence': 'high' if scoring_result['overall_score'] > 80 or scoring_result['overall_score'] < 40 else 'medium',
+                'reason': scoring_result['recommendation_reason']
+            },
+            'risk_assessment': scoring_result['risk_flags'],
+            'positive_factors': scoring_result['positive_indicators'],
+            'insights': scoring_result.get('insights', {}),
+            'rescored_at': datetime.utcnow().isoformat()
+        })
+        screening_result.detailed_report = report
+
     def _generate_summary(self, scoring_result: Dict) -> str:
         recommendation = scoring_result['recommendation']
         overall_score = scoring_result['overall_score']
@@ -199,16 +419,3 @@ class ScreeningService:
             'insights': scoring_result.get('insights', {}),
             'generated_at': datetime.utcnow().isoformat()
         }
-
-    def _determine_platform_for_text(self, text: str, footprints: List[Dict]) -> str:
-        for footprint in footprints:
-            if footprint.get('bio') == text:
-                return footprint.get('platform', 'unknown')
-            
-            posts_data = footprint.get('posts_data', [])
-            if isinstance(posts_data, list):
-                for post in posts_data:
-                    if isinstance(post, dict) and post.get('text') == text:
-                        return footprint.get('platform', 'unknown')
-        
-        return 'unknown'
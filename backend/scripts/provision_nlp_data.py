@@ -0,0 +1,30 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from app.core.config import settings
+from app.services.ai.nlp_resources import provision
+from app.services.ai.sentiment_backends import get_sentiment_backend
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download NLTK resources into NLTK_DATA_DIR for offline use")
+    parser.add_argument("--data-dir", default=settings.NLTK_DATA_DIR)
+    parser.add_argument("resources", nargs="*", default=get_sentiment_backend().required_resources())
+    args = parser.parse_args()
+
+    if not args.resources:
+        print(f"✅ The {settings.SENTIMENT_BACKEND} sentiment backend needs no NLTK data")
+        return
+
+    print(f"📦 Provisioning {', '.join(args.resources)} into {args.data_dir}...")
+    missing = provision(args.resources, data_dir=args.data_dir)
+    if missing:
+        print(f"❌ Still missing: {', '.join(missing)}")
+        sys.exit(1)
+    print("✅ NLP resources ready; set NLP_OFFLINE=true to forbid runtime downloads")
+
+
+if __name__ == "__main__":
+    main()
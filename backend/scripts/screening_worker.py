@@ -0,0 +1,42 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import multiprocessing
+from app.core.config import settings
+from app.core.database import engine, Base
+from app.services.job_queue import consume_redis_queue
+
+Base.metadata.create_all(bind=engine)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run screening jobs queued in Redis")
+    parser.add_argument("--workers", type=int, default=settings.JOB_MAX_CONCURRENCY)
+    args = parser.parse_args()
+
+    if not settings.REDIS_URL:
+        print("❌ REDIS_URL is not set; the API runs jobs in-process instead")
+        sys.exit(1)
+
+    print(f"👷 Starting {args.workers} screening workers on '{settings.JOB_QUEUE_NAME}'...")
+    ctx = multiprocessing.get_context("spawn")
+    # Not daemonic: a worker's SentimentAnalyzer starts its own process pool for large batches
+    workers = [
+        ctx.Process(target=consume_redis_queue, kwargs={"processes": args.workers})
+        for _ in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping workers")
+        for worker in workers:
+            worker.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Same file test_api.py points get_db at
+TEST_DATABASE_URL = 'sqlite:///./test.db'
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out as separate writes; without this, keep-alive
+    # connections stall on Nagle + delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        with self.server.lock:
+            self.server.requests.append(parsed.path)
+            self.server.connections.add(self.client_address)
+            attempt = self.server.attempts.get(parsed.path, 0) + 1
+            self.server.attempts[parsed.path] = attempt
+
+        delay = float(params.get('delay', 0))
+        if delay:
+            time.sleep(delay)
+
+        # ?fail=N answers the first N requests for a path with ?status (default 503)
+        if attempt <= int(params.get('fail', 0)):
+            self._send(int(params.get('status', 503)), b'')
+            return
+
+        # ?etag=X answers 304 when the client already holds X
+        etag = params.get('etag')
+        if etag and self.headers.get('If-None-Match') == f'"{etag}"':
+            self._send(304, b'', {'ETag': f'"{etag}"'})
+            return
+
+        body = json.dumps({'path': parsed.path, 'params': params, 'attempt': attempt}).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        if etag:
+            headers['ETag'] = f'"{etag}"'
+        if params.get('gzip') and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            headers['Content-Encoding'] = 'gzip'
+        self._send(200, body, headers)
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer:
+    """Local HTTP stand-in for platform endpoints; `?delay=0.5` injects latency."""
+
+    def __init__(self):
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.lock = threading.Lock()
+        self.httpd.requests = []
+        self.httpd.connections = set()
+        self.httpd.attempts = {}
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def requests(self):
+        return self.httpd.requests
+
+    @property
+    def connections(self):
+        return self.httpd.connections
+
+    def url(self, path: str, **params) -> str:
+        host, port = self.httpd.server_address
+        query = f"?{urlencode(params)}" if params else ''
+        return f"http://{host}:{port}{path}{query}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    server = StubServer().start()
+    try:
+        yield server
+    finally:
+        server.stop()
+
+
+@pytest.fixture(autouse=True, scope='session')
+def job_worker_sessions():
+    # Jobs run on threads of the test process, against the test database rather than DATABASE_URL
+    from app.core.config import settings
+    from app.services import job_queue
+
+    engine = create_engine(TEST_DATABASE_URL, connect_args={'check_same_thread': False})
+    settings.JOB_LOCAL_EXECUTOR = 'thread'
+    job_queue.set_session_factory(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    yield
+    job_queue.shutdown_job_queue()
+    engine.dispose()
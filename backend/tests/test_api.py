@@ -1,8 +1,11 @@
 import pytest
+import time
+import uuid
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.main import app
+from app.core.config import settings
 from app.core.database import Base, get_db
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -64,3 +67,495 @@ def test_dashboard_merit():
     response = client.get("/api/v1/dashboard/merit")
     assert response.status_code == 200
     assert "overview" in response.json()
+
+
+def test_routes_share_service_container(monkeypatch):
+    from app.services.container import get_service_container
+
+    analyzer = get_service_container().sentiment_analyzer
+    seen = []
+    analyze_posts = analyzer.analyze_posts
+    monkeypatch.setattr(analyzer, "analyze_posts", lambda texts, **kw: seen.append(texts) or analyze_posts(texts, **kw))
+
+    for _ in range(2):
+        response = client.post("/api/v1/screening/analyze-text", json={"texts": ["Melayani dengan integritas"]})
+        assert response.status_code == 200
+    assert len(seen) == 2
+
+
+def test_offline_startup_fails_fast_on_missing_nlp_resources(tmp_path, monkeypatch):
+    from app.services.ai.nlp_resources import MissingNLPResources
+
+    monkeypatch.setattr(settings, "NLTK_DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "NLTK_RESOURCES", ["tokenizers/not_vendored"])
+    monkeypatch.setattr(settings, "NLP_OFFLINE", True)
+    with pytest.raises(MissingNLPResources):
+        with TestClient(app):
+            pass
+
+
+def _create_candidate(**overrides):
+    suffix = uuid.uuid4().hex[:8]
+    candidate_data = {
+        "full_name": "Screening Candidate",
+        "email": f"candidate-{suffix}@example.com",
+        "nik": str(uuid.uuid4().int)[:16],
+        "applied_position": "Analis Kebijakan",
+        "twitter_username": f"user{suffix}",
+        "linkedin_url": f"https://linkedin.com/in/user{suffix}",
+    }
+    candidate_data.update(overrides)
+    response = client.post("/api/v1/candidates/", json=candidate_data)
+    assert response.status_code == 201
+    return response.json()
+
+
+def _wait_for_job(job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/v1/screening/jobs/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} still {job['status']} after {timeout}s")
+
+
+def _run_screening(candidate_id, **options):
+    response = client.post("/api/v1/screening/analyze", json={"candidate_id": candidate_id, **options})
+    assert response.status_code == 202
+    job = _wait_for_job(response.json()["id"])
+    assert job["status"] == "completed", job["error"]
+    return client.get(f"/api/v1/screening/result/{job['screening_result_id']}").json()
+
+
+def test_rescore_screening_results():
+    candidate = _create_candidate()
+
+    original_score = _run_screening(candidate["id"])["overall_score"]
+
+    response = client.post("/api/v1/screening/rescore", json={"candidate_ids": [candidate["id"]]})
+    assert response.status_code == 200
+    assert response.json() == {"rescored": 1, "skipped": 0}
+
+    results = client.get(f"/api/v1/screening/{candidate['id']}/results").json()
+    assert results[0]["overall_score"] == original_score
+
+
+def test_live_profile_scrape():
+    candidate = _create_candidate()
+
+    response = client.get(f"/api/v1/screening/{candidate['id']}/profiles/live")
+    assert response.status_code == 200
+    platforms = [f["platform"] for f in response.json()["footprints"]]
+    assert platforms == ["linkedin", "twitter"]
+
+    assert client.get("/api/v1/screening/999999/profiles/live").status_code == 404
+
+
+def _footprint_count(candidate_id):
+    return len(client.get(f"/api/v1/screening/{candidate_id}/digital-footprints").json())
+
+
+def test_screening_reuses_fresh_footprints():
+    candidate = _create_candidate()
+
+    _run_screening(candidate["id"])
+    assert _footprint_count(candidate["id"]) == 2
+
+    assert _run_screening(candidate["id"])["sentiment_score"] is not None
+    assert _footprint_count(candidate["id"]) == 2
+
+    _run_screening(candidate["id"], force_refresh=True)
+    assert _footprint_count(candidate["id"]) == 4
+
+
+def test_screening_job_lifecycle():
+    candidate = _create_candidate()
+
+    response = client.post("/api/v1/screening/analyze", json={"candidate_id": candidate["id"]})
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] in ("queued", "running", "completed")
+
+    job = _wait_for_job(job["id"])
+    assert job["status"] == "completed"
+    assert job["stage"] == "done" and job["progress"] == 1.0
+    assert job["attempts"] == 1
+
+    jobs = client.get("/api/v1/screening/jobs", params={"candidate_id": candidate["id"]}).json()
+    assert [j["id"] for j in jobs] == [job["id"]]
+    assert client.get("/api/v1/screening/jobs/unknown").status_code == 404
+    assert client.post("/api/v1/screening/analyze", json={"candidate_id": 999999}).status_code == 404
+
+
+def _wait_for_cohort(cohort_id, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        cohort = client.get(f"/api/v1/screening/cohorts/{cohort_id}").json()
+        if cohort["finished"]:
+            return cohort
+        time.sleep(0.05)
+    raise AssertionError(f"cohort {cohort_id} unfinished after {timeout}s: {cohort['counts']}")
+
+
+def test_cohort_screening():
+    ids = [_create_candidate()["id"] for _ in range(3)]
+
+    response = client.post("/api/v1/screening/cohorts", json={"candidate_ids": ids + [999999], "name": "Gelombang 1"})
+    assert response.status_code == 202
+    cohort = response.json()
+    assert cohort["total_jobs"] == 3
+    assert cohort["selection"] == {"candidate_ids": ids + [999999]}
+
+    cohort = _wait_for_cohort(cohort["id"])
+    assert cohort["counts"]["completed"] == 3 and cohort["progress"] == 1.0
+    jobs = client.get("/api/v1/screening/jobs", params={"cohort_id": cohort["id"]}).json()
+    assert sorted(j["candidate_id"] for j in jobs) == ids
+    for candidate_id in ids:
+        assert client.get(f"/api/v1/screening/{candidate_id}/results").status_code == 200
+
+    status_tag = f"wave-{uuid.uuid4().hex[:8]}"
+    for candidate_id in ids[:2]:
+        assert client.put(f"/api/v1/candidates/{candidate_id}", json={"status": status_tag}).status_code == 200
+    response = client.post("/api/v1/screening/cohorts", json={"status": status_tag})
+    assert response.status_code == 202
+    assert response.json()["total_jobs"] == 2
+    assert _wait_for_cohort(response.json()["id"])["counts"]["completed"] == 2
+
+    assert client.post("/api/v1/screening/cohorts", json={}).status_code == 400
+    assert client.post("/api/v1/screening/cohorts", json={"candidate_ids": ids, "status": status_tag}).status_code == 400
+    assert client.post("/api/v1/screening/cohorts", json={"status": "no-such-status"}).status_code == 404
+    assert client.get("/api/v1/screening/cohorts/unknown").status_code == 404
+
+
+def test_screening_job_retries_then_fails(monkeypatch):
+    from app.models.job import ScreeningJob
+    from app.services import job_queue
+    from app.services.screening_service import ScreeningService
+
+    candidate = _create_candidate()
+    calls = []
+
+    def flaky(self, candidate_id, **kwargs):
+        calls.append(candidate_id)
+        if len(calls) < 3:
+            raise RuntimeError("platform unavailable")
+        return conduct_screening(self, candidate_id, **kwargs)
+
+    conduct_screening = ScreeningService.conduct_screening
+    monkeypatch.setattr(ScreeningService, "conduct_screening", flaky)
+    monkeypatch.setattr(settings, "JOB_RETRY_BACKOFF", 0.01)
+    # Run each job synchronously inside enqueue_screening
+    monkeypatch.setattr(job_queue, "get_job_queue", lambda: job_queue.LocalJobQueue(1, "thread"))
+    monkeypatch.setattr(job_queue.LocalJobQueue, "submit", lambda self, job_id: job_queue.run_screening_job(job_id))
+
+    db = TestingSessionLocal()
+    try:
+        job = job_queue.enqueue_screening(db, candidate["id"])
+        db.expire_all()
+        job = db.get(ScreeningJob, job.id)
+        assert job.status == "completed" and job.attempts == 3
+        assert job.screening_result_id is not None
+
+        calls.clear()
+        monkeypatch.setattr(settings, "JOB_MAX_ATTEMPTS", 2)
+        job = job_queue.enqueue_screening(db, candidate["id"])
+        db.expire_all()
+        job = db.get(ScreeningJob, job.id)
+        assert job.status == "failed" and job.attempts == 2
+        assert job.error == "platform unavailable"
+    finally:
+        db.close()
+
+
+def test_stale_jobs_requeued_or_failed(monkeypatch):
+    from datetime import datetime, timedelta
+    from app.models.job import ScreeningJob
+    from app.services import job_queue
+
+    candidate = _create_candidate()
+    submitted = []
+    queue = job_queue.LocalJobQueue(1, "thread")
+    monkeypatch.setattr(queue, "submit_many", submitted.extend)
+    monkeypatch.setattr(job_queue, "get_job_queue", lambda: queue)
+
+    old = datetime.utcnow() - timedelta(hours=2)
+    jobs = {
+        "interrupted": dict(status="running", attempts=1, max_attempts=3, updated_at=old),
+        "exhausted": dict(status="running", attempts=3, max_attempts=3, updated_at=old),
+        "lost": dict(status="queued", attempts=0, max_attempts=3, updated_at=old),
+        "fresh": dict(status="running", attempts=1, max_attempts=3, updated_at=datetime.utcnow()),
+        "done": dict(status="completed", attempts=1, max_attempts=3, updated_at=old),
+    }
+    ids = {name: uuid.uuid4().hex for name in jobs}
+    db = TestingSessionLocal()
+    try:
+        for name, values in jobs.items():
+            db.add(ScreeningJob(id=ids[name], candidate_id=candidate["id"], **values))
+        db.commit()
+
+        swept = job_queue.requeue_stale_jobs(db, timeout=3600)
+        assert sorted(submitted) == sorted([ids["interrupted"], ids["lost"]])
+        assert swept == {"requeued": 2, "failed": 1}
+
+        db.expire_all()
+        status = {name: db.get(ScreeningJob, ids[name]).status for name in jobs}
+        assert status == {
+            "interrupted": "queued", "exhausted": "failed", "lost": "queued", "fresh": "running", "done": "completed"
+        }
+    finally:
+        db.close()
+
+
+def test_screening_job_runs_once_per_claim(monkeypatch):
+    from app.models.job import ScreeningJob
+    from app.services import job_queue
+    from app.services.screening_service import ScreeningService
+
+    candidate = _create_candidate()
+    calls = []
+    conduct_screening = ScreeningService.conduct_screening
+
+    def counted(self, candidate_id, **kwargs):
+        calls.append(candidate_id)
+        return conduct_screening(self, candidate_id, **kwargs)
+
+    monkeypatch.setattr(ScreeningService, "conduct_screening", counted)
+    ids = {status: uuid.uuid4().hex for status in ("queued", "running", "failed")}
+    db = TestingSessionLocal()
+    try:
+        for status, job_id in ids.items():
+            db.add(ScreeningJob(id=job_id, candidate_id=candidate["id"], status=status, attempts=0, max_attempts=3))
+        db.commit()
+
+        # A job submitted twice (e.g. swept by another worker) runs once
+        job_queue.run_screening_job(ids["queued"])
+        job_queue.run_screening_job(ids["queued"])
+        job_queue.run_screening_job(ids["running"])
+        job_queue.run_screening_job(ids["failed"])
+        assert calls == [candidate["id"]]
+
+        db.expire_all()
+        job = db.get(ScreeningJob, ids["queued"])
+        assert job.status == "completed" and job.attempts == 1
+        assert db.get(ScreeningJob, ids["running"]).attempts == 0
+    finally:
+        db.close()
+
+
+def test_footprint_cache_revalidates_stale_rows(stub_server):
+    from datetime import datetime, timedelta
+    from app.models.screening import DigitalFootprint
+    from app.services.scraping.footprint_cache import FootprintCache
+    from app.services.scraping.rate_limiter import RateLimiter
+    from app.services.scraping.social_media_scraper import SocialMediaScraper
+
+    candidate = _create_candidate()
+    scraper = SocialMediaScraper()
+    scraper.rate_limiter = RateLimiter({}, burst=1)
+    scraper.platform_revalidators["twitter"] = lambda handle, etag, last_modified: scraper.is_not_modified(
+        stub_server.url(f"/twitter/{handle}", etag="v2"), "twitter", etag, last_modified
+    )
+
+    db = TestingSessionLocal()
+    try:
+        stale = datetime.utcnow() - timedelta(days=2)
+        db.add(DigitalFootprint(candidate_id=candidate["id"], platform="twitter", username="ana",
+                                scraped_at=stale, scraping_status="completed", etag='"v1"'))
+        db.commit()
+
+        cache = FootprintCache(db, scraper, ttls={"twitter": 3600})
+        assert cache.lookup(candidate["id"], {"twitter": "@ana"}) == {}
+
+        db.query(DigitalFootprint).filter(DigitalFootprint.candidate_id == candidate["id"]).update({"etag": '"v2"'})
+        db.commit()
+        reused = cache.lookup(candidate["id"], {"twitter": "@ana"})
+        assert reused["twitter"].scraped_at > stale
+        assert cache.lookup(candidate["id"], {"twitter": "@someone_else"}) == {}
+    finally:
+        db.close()
+
+
+def test_incremental_screening_analyses_only_new_posts():
+    from datetime import datetime
+    from app.services.screening_service import ScreeningService
+
+    candidate = _create_candidate(linkedin_url=None)
+    timeline = [
+        {"text": "Melayani masyarakat dengan integritas", "date": "2024-01-10", "likes": 3},
+        {"text": "Rapat koordinasi pelayanan publik", "date": "2024-01-08", "likes": 1},
+    ]
+
+    def scrape_twitter(username, since=None):
+        from app.services.scraping.incremental import paginate_timeline
+        posts = paginate_timeline(lambda page: [timeline[page]] if page < len(timeline) else [], since, 10)
+        return {"platform": "twitter", "username": username.replace("@", ""), "follower_count": 10,
+                "following_count": 5, "post_count": len(timeline), "posts_data": posts,
+                "scraped_at": datetime.utcnow(), "scraping_status": "completed"}
+
+    db = TestingSessionLocal()
+    try:
+        service = ScreeningService(db)
+        service.scraper.platform_scrapers["twitter"] = scrape_twitter
+        service.footprint_cache.ttls = {}
+        analyzed = []
+        analyze_posts = service.sentiment_analyzer.analyze_posts
+        service.sentiment_analyzer.analyze_posts = lambda texts, **kw: analyzed.append(list(texts)) or analyze_posts(texts, **kw)
+
+        first = service.conduct_screening(candidate["id"])
+        timeline.insert(0, {"text": "Kecewa dengan layanan yang lambat!", "date": "2024-01-12", "likes": 9})
+        second = service.conduct_screening(candidate["id"])
+
+        assert analyzed[0] == [p["text"] for p in timeline[1:]]
+        assert analyzed[1] == [timeline[0]["text"]]
+
+        stored = service.footprint_cache.latest(candidate["id"], {"twitter": candidate["twitter_username"]})["twitter"]
+        assert [p["text"] for p in stored.posts_data] == [p["text"] for p in timeline]
+
+        # Same aggregate as analysing the whole merged timeline from scratch
+        full = service.sentiment_analyzer.calculate_aggregate_sentiment(
+            analyze_posts([p["text"] for p in timeline])
+        )
+        assert second.sentiment_data["average_sentiment"] == pytest.approx(full["average_sentiment"])
+        assert second.sentiment_data["negative_ratio"] == pytest.approx(full["negative_ratio"])
+        assert first.sentiment_data != second.sentiment_data
+    finally:
+        db.close()
+
+
+def _timeline_scraper(timeline, status="completed"):
+    from datetime import datetime
+    from app.services.scraping.incremental import paginate_timeline
+
+    def scrape_twitter(username, since=None):
+        if status != "completed":
+            return {"platform": "twitter", "username": username.replace("@", ""),
+                    "scraped_at": datetime.utcnow(), "scraping_status": status, "scraping_error": "timed out"}
+        posts = paginate_timeline(lambda page: [timeline[page]] if page < len(timeline) else [], since, 10)
+        return {"platform": "twitter", "username": username.replace("@", ""), "follower_count": 10,
+                "following_count": 5, "post_count": len(timeline), "posts_data": posts,
+                "scraped_at": datetime.utcnow(), "scraping_status": "completed"}
+    return scrape_twitter
+
+
+def test_rescreening_lists_every_post():
+    from app.services.screening_service import ScreeningService
+
+    candidate = _create_candidate(linkedin_url=None)
+    timeline = [
+        {"text": "Melayani masyarakat dengan integritas", "date": "2024-01-10"},
+        {"text": "Rapat koordinasi pelayanan publik", "date": "2024-01-08"},
+    ]
+
+    db = TestingSessionLocal()
+    try:
+        service = ScreeningService(db)
+        service.scraper.platform_scrapers["twitter"] = _timeline_scraper(timeline)
+        service.footprint_cache.ttls = {}
+        service.conduct_screening(candidate["id"])
+
+        timeline.insert(0, {"text": "Kecewa dengan layanan yang lambat!", "date": "2024-01-12"})
+        incremental = service.conduct_screening(candidate["id"]).id
+        service.footprint_cache.ttls = {"twitter": 3600}
+        cached = service.conduct_screening(candidate["id"]).id
+    finally:
+        db.close()
+
+    for result_id in (incremental, cached):
+        response = client.get(f"/api/v1/screening/result/{result_id}").json()
+        posts = [row["content_text"] for row in response["sentiment_analyses"] if row["content_type"] == "post"]
+        assert sorted(posts) == sorted(p["text"] for p in timeline)
+
+
+def test_failed_refresh_keeps_stored_footprint():
+    from app.services.screening_service import ScreeningService
+
+    candidate = _create_candidate(linkedin_url=None)
+    timeline = [
+        {"text": "Melayani masyarakat dengan integritas", "date": "2024-01-10"},
+        {"text": "Kecewa dengan layanan yang lambat!", "date": "2024-01-08"},
+    ]
+
+    db = TestingSessionLocal()
+    try:
+        service = ScreeningService(db)
+        service.footprint_cache.ttls = {}
+        service.scraper.platform_scrapers["twitter"] = _timeline_scraper(timeline)
+        first = service.conduct_screening(candidate["id"])
+
+        service.scraper.platform_scrapers["twitter"] = _timeline_scraper(timeline, status="timeout")
+        second = service.conduct_screening(candidate["id"])
+
+        assert second.sentiment_data == first.sentiment_data
+        assert second.overall_score == first.overall_score
+        latest = service.footprint_cache.latest(candidate["id"], {"twitter": candidate["twitter_username"]})
+        assert len(latest["twitter"].posts_data) == 2
+    finally:
+        db.close()
+    assert _footprint_count(candidate["id"]) == 1
+
+
+def test_screening_streams_posts_in_chunks():
+    from datetime import datetime
+    from app.models.screening import SentimentAnalysis
+    from app.services.screening_service import ScreeningService
+
+    candidate = _create_candidate(linkedin_url=None)
+    posts = [{"text": f"Pelayanan publik hari ke-{i}", "date": f"2024-02-{i + 1:02d}"} for i in range(20)]
+
+    db = TestingSessionLocal()
+    try:
+        service = ScreeningService(db)
+        service.chunk_size = 7
+        service.scraper.platform_scrapers["twitter"] = lambda username: {
+            "platform": "twitter", "username": username, "posts_data": posts,
+            "scraped_at": datetime.utcnow(), "scraping_status": "completed",
+        }
+        batch_sizes = []
+        analyze_posts = service.sentiment_analyzer.analyze_posts
+        service.sentiment_analyzer.analyze_posts = lambda texts, **kw: batch_sizes.append(len(texts)) or analyze_posts(texts, **kw)
+
+        result = service.conduct_screening(candidate["id"])
+
+        assert batch_sizes == [7, 7, 6]
+        assert not any(isinstance(obj, SentimentAnalysis) for obj in db.identity_map.values())
+        assert db.query(SentimentAnalysis).filter(SentimentAnalysis.screening_result_id == result.id).count() == 20
+        assert result.recommendation is not None
+    finally:
+        db.close()
+
+
+def test_screening_attributes_posts_to_their_platform():
+    from datetime import datetime
+    from app.models.screening import SentimentAnalysis
+    from app.services.screening_service import ScreeningService
+
+    candidate = _create_candidate(instagram_username="ana")
+    shared = {"text": "Selamat Hari Pahlawan!", "date": "2024-11-10"}
+
+    db = TestingSessionLocal()
+    try:
+        service = ScreeningService(db)
+        service.scraper.platform_scrapers["twitter"] = lambda username: {
+            "platform": "twitter", "username": username, "profile_url": f"https://twitter.com/{username}",
+            "posts_data": [dict(shared, id=1, url="https://twitter.com/i/status/1")],
+            "scraped_at": datetime.utcnow(), "scraping_status": "completed",
+        }
+        service.scraper.platform_scrapers["instagram"] = lambda username: {
+            "platform": "instagram", "username": username, "profile_url": "https://instagram.com/ana",
+            "bio": "Abdi negara", "posts_data": [shared],
+            "scraped_at": datetime.utcnow(), "scraping_status": "completed",
+        }
+        service.scraper.platform_scrapers["linkedin"] = lambda url: None
+
+        result = service.conduct_screening(candidate["id"])
+        rows = db.query(SentimentAnalysis).filter(SentimentAnalysis.screening_result_id == result.id).all()
+        attributed = sorted((r.platform, r.content_type, r.content_url) for r in rows)
+
+        assert attributed == [
+            ("instagram", "bio", "https://instagram.com/ana"),
+            ("instagram", "post", "https://instagram.com/ana"),
+            ("twitter", "post", "https://twitter.com/i/status/1"),
+        ]
+    finally:
+        db.close()
@@ -106,3 +106,768 @@ def test_scoring_with_risk_flags():
     
     assert result['recommendation'] == 'tidak_layak'
     assert len(result['risk_flags']) > 0
+
+
+def test_lexicon_matcher_matches_substring_counts():
+    from app.services.ai.lexicon_matcher import LexiconMatcher
+
+    lexicons = {
+        'politeness': ['terima kasih', 'mohon maaf', 'mohon', 'tolong'],
+        'profanity': ['anjing', 'tai', 'tai'],
+        'political': ['partai', 'dpr'],
+    }
+    matcher = LexiconMatcher(lexicons)
+
+    text = "mohon maaf, terima kasih partai dpr anjing santai. tolong mohon ya"
+    hits = matcher.count(text)
+
+    for category, keywords in lexicons.items():
+        assert hits[category] == sum(text.count(kw) for kw in keywords)
+
+
+def test_token_index_respects_word_boundaries():
+    from app.services.ai.lexicon_matcher import TokenLexiconIndex, tokenize
+
+    index = TokenLexiconIndex({
+        'profanity': ['tai'],
+        'hate_speech': ['mati'],
+        'politeness': ['terima kasih', 'mohon maaf', 'mohon'],
+    })
+
+    hits = index.count(tokenize("tolong matikan lampu, santai saja"))
+    assert hits['profanity'] == 0
+    assert hits['hate_speech'] == 0
+
+    hits = index.count(tokenize("mohon maaf dan terima kasih, mohon dibantu"))
+    assert hits['politeness'] == 4
+
+
+def test_sentiment_analyzer_token_mode_avoids_substring_hits():
+    analyzer = SentimentAnalyzer()
+    analyzer.match_mode = 'token'
+    analyzer.rebuild_lexicons()
+
+    result = analyzer.analyze_text("Mari santai sejenak, jangan lupa matikan komputer")
+    assert result['contains_profanity'] == 0
+    assert result['contains_hate_speech'] == 0
+
+    analyzer.match_mode = 'substring'
+    analyzer.rebuild_lexicons()
+    result = analyzer.analyze_text("Mari santai sejenak, jangan lupa matikan komputer")
+    assert result['contains_profanity'] == 1
+
+
+def test_parallel_batch_matches_serial_order():
+    analyzer = SentimentAnalyzer()
+    analyzer.batch_workers = 2
+    analyzer.batch_chunk_size = 4
+
+    texts = [
+        f"Postingan {i}: pelayanan publik {'sangat baik' if i % 2 else 'buruk sekali, anjing'}!"
+        for i in range(30)
+    ]
+
+    try:
+        parallel = analyzer.analyze_batch(texts, parallel=True)
+    finally:
+        analyzer.close()
+
+    assert parallel == analyzer.analyze_batch(texts, parallel=False)
+
+
+def test_small_batch_falls_back_to_serial():
+    analyzer = SentimentAnalyzer()
+    analyzer.batch_workers = 2
+
+    results = analyzer.analyze_batch(["Terima kasih", "Selamat pagi"])
+
+    assert len(results) == 2
+    assert analyzer._pool is None
+
+
+def test_analysis_cache_hits_and_invalidation():
+    from app.services.ai.analysis_cache import AnalysisCache
+
+    analyzer = SentimentAnalyzer()
+    analyzer.cache = AnalysisCache(maxsize=2)
+    text = "Terima kasih atas pelayanan yang sangat baik"
+
+    first = analyzer.analyze_text(text)
+    second = analyzer.analyze_text("  " + text + "  ")
+    assert first == second
+    assert analyzer.cache.stats()['hits'] == 1
+
+    # Mutating a returned result must not leak into the cache
+    second['keywords'].append('bocor')
+    assert 'bocor' not in analyzer.analyze_text(text)['keywords']
+
+    analyzer.positive_threshold = 0.01
+    analyzer.analyze_text(text)
+    analyzer.profanity_keywords.append('pelayanan')
+    analyzer.rebuild_lexicons()
+    assert analyzer.analyze_text(text)['contains_profanity'] == 1
+
+    stats = analyzer.cache.stats()
+    assert stats['misses'] == 3
+    assert stats['size'] == 2
+
+
+def test_persistent_cache_survives_new_analyzer(tmp_path):
+    from app.services.ai.analysis_cache import AnalysisCache
+    from app.services.ai.persistent_cache import PersistentAnalysisCache
+
+    store = PersistentAnalysisCache(str(tmp_path / 'analysis.sqlite3'), max_entries=2)
+    text = "Semangat melayani masyarakat dengan integritas"
+
+    first = SentimentAnalyzer()
+    first.cache = AnalysisCache(maxsize=10)
+    first.persistent_cache = store
+    expected = first.analyze_text(text)
+
+    # Simulates a restarted worker: empty in-memory cache, same store
+    second = SentimentAnalyzer()
+    second.cache = AnalysisCache(maxsize=10)
+    second.persistent_cache = store
+    assert second.analyze_text(text) == expected
+    assert second.cache.stats()['size'] == 1
+
+    for i in range(3):
+        store.set(f'key-{i}', first.version, expected)
+    store.evict()
+    assert store.count() == 2
+
+
+def test_persistent_cache_throttles_touches_and_prunes_versions(tmp_path, monkeypatch):
+    import time
+    from app.services.ai.persistent_cache import PersistentAnalysisCache
+
+    store = PersistentAnalysisCache(str(tmp_path / 'analysis.sqlite3'), max_entries=10)
+    store.set('old', 'v1', {'sentiment_score': 0.1})
+    store.set('new', 'v2', {'sentiment_score': 0.2})
+
+    def accessed_at(key):
+        return store._connection().execute(
+            'SELECT accessed_at FROM analysis_cache WHERE key = ?', (key,)
+        ).fetchone()[0]
+
+    stamp = accessed_at('new')
+    assert store.get('new', 'v2') == {'sentiment_score': 0.2}
+    assert accessed_at('new') == stamp
+
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + store.TOUCH_INTERVAL + 1)
+    store.get('new', 'v2')
+    assert accessed_at('new') > stamp
+
+    assert store.get('old', 'v2') is None
+    assert store.evict('v2') == 1
+    assert store.count() == 1 and store.get('new', 'v2') is not None
+
+
+def test_columnar_aggregate_matches_row_path():
+    import random
+    from app.services.ai import sentiment_analyzer as module
+
+    rng = random.Random(7)
+    analyses = [
+        {
+            'sentiment_label': rng.choice(['positive', 'negative', 'neutral']),
+            'sentiment_score': rng.uniform(-1, 1),
+            'confidence': rng.random(),
+            'toxicity_score': rng.random(),
+            'caps_ratio': rng.random(),
+            'exclamation_count': rng.randint(0, 5),
+            'contains_link': rng.randint(0, 1),
+            'contains_profanity': rng.randint(0, 1),
+            'contains_hate_speech': rng.randint(0, 1),
+            'contains_political_content': rng.randint(0, 1),
+            'professional_keywords_count': rng.randint(0, 3),
+            'likely_language': rng.choice(['id', 'en', 'unknown', 'fr']),
+        }
+        for _ in range(1000)
+    ]
+    analyzer = SentimentAnalyzer()
+    original_min = module.COLUMNAR_AGGREGATE_MIN
+
+    # Complete analyzer output and a partial hand-built row take different packing paths
+    for batch in (analyses, analyses + [{'sentiment_label': 'neutral'}]):
+        columnar = analyzer.calculate_aggregate_sentiment(batch)
+        module.COLUMNAR_AGGREGATE_MIN = len(batch) + 1
+        try:
+            rows = analyzer.calculate_aggregate_sentiment(batch)
+        finally:
+            module.COLUMNAR_AGGREGATE_MIN = original_min
+
+        assert columnar.keys() == rows.keys()
+        for key, value in rows.items():
+            assert type(columnar[key]) is type(value), key
+            if isinstance(value, float):
+                assert columnar[key] == pytest.approx(value, rel=1e-12, abs=1e-12), key
+            else:
+                assert columnar[key] == value, key
+
+
+def test_post_analysis_records_flow_through_scoring():
+    from app.services.ai.post_analysis import PostAnalysis
+
+    analyzer = SentimentAnalyzer()
+    texts = ["Terima kasih atas pelayanan publik yang profesional", "Dasar anjing!"]
+
+    records = analyzer.analyze_posts(texts)
+    assert all(isinstance(r, PostAnalysis) for r in records)
+    assert [r.to_dict() for r in records] == analyzer.analyze_batch(texts)
+    assert PostAnalysis.from_dict(records[0].to_dict()) == records[0]
+
+    engine = ScoringEngine()
+    from_records = engine.calculate_overall_score(
+        analyzer.calculate_aggregate_sentiment(records), [], records
+    )
+    dicts = [r.to_dict() for r in records]
+    from_dicts = engine.calculate_overall_score(
+        analyzer.calculate_aggregate_sentiment(dicts), [], dicts
+    )
+    assert from_records == from_dicts
+
+
+def test_score_batch_matches_per_candidate_scoring():
+    import random
+
+    rng = random.Random(11)
+    engine = ScoringEngine()
+    candidates = []
+
+    for _ in range(300):
+        sentiment_data = {
+            'average_sentiment': rng.uniform(-1, 1),
+            'positive_ratio': rng.random(),
+            'negative_ratio': rng.choice([rng.random(), 0.3]),
+            'avg_confidence': rng.random(),
+            'avg_toxicity': rng.choice([rng.random(), 0.05, 0.7]),
+            'total_hate_speech': rng.choice([0, 0, 0, 1]),
+            'total_profanity': rng.randint(0, 4),
+            'contains_links_ratio': rng.random(),
+            'excessive_caps_ratio': rng.random(),
+        }
+        footprints = [
+            {
+                'platform': rng.choice(['linkedin', 'twitter', 'facebook']),
+                'bio': rng.choice(['', 'ASN']),
+                'follower_count': rng.randint(0, 2000),
+                'following_count': rng.randint(0, 800),
+                'post_count': rng.randint(0, 150),
+                'posts_data': [
+                    {'likes': rng.randint(0, 60), 'comments': rng.randint(0, 10)}
+                    for _ in range(rng.randint(0, 3))
+                ],
+            }
+            for _ in range(rng.randint(0, 4))
+        ]
+        analyses = [
+            {
+                'contains_profanity': rng.randint(0, 1),
+                'professional_keywords_count': rng.randint(0, 3),
+                'politeness_keywords_count': rng.randint(0, 3),
+                'spam_indicator': rng.randint(0, 1),
+            }
+            for _ in range(rng.randint(0, 6))
+        ]
+        candidates.append((sentiment_data, footprints, analyses))
+
+    batch = engine.score_batch(engine.stack_features([
+        engine.extract_features(*candidate) for candidate in candidates
+    ]))
+
+    for i, candidate in enumerate(candidates):
+        expected = engine.calculate_overall_score(*candidate)
+        for key in ('overall_score', 'sentiment_score', 'professionalism_score',
+                    'digital_ethics_score', 'social_score'):
+            assert round(float(batch[key][i]), 2) == expected[key], (i, key)
+        assert batch['recommendation'][i] == expected['recommendation'], i
+
+
+def test_rescore_from_stored_aggregates_matches_full_scoring():
+    import json
+
+    analyzer = SentimentAnalyzer()
+    engine = ScoringEngine()
+    footprints = [
+        {'platform': 'linkedin', 'bio': 'ASN', 'follower_count': 450, 'following_count': 320,
+         'post_count': 78, 'posts_data': [{'likes': 45, 'comments': 8}]},
+        {'platform': 'twitter', 'follower_count': 1250, 'following_count': 380, 'post_count': 234},
+    ]
+    analyses = analyzer.analyze_posts([
+        "Terima kasih, pelayanan publik semakin profesional",
+        "Inovasi dan integritas adalah kunci",
+    ])
+    sentiment_data = analyzer.calculate_aggregate_sentiment(analyses)
+
+    expected = engine.calculate_overall_score(sentiment_data, footprints, analyses)
+
+    # Round-trip through JSON exactly like the ScreeningResult columns
+    stored = json.loads(json.dumps({
+        'sentiment_data': sentiment_data,
+        'engagement_insights': expected['insights']['engagement'],
+        'scoring_features': engine.extract_features(sentiment_data, footprints, analyses),
+    }))
+    rescored = engine.rescore_aggregates([stored])[0]
+
+    assert json.loads(json.dumps(rescored)) == json.loads(json.dumps(expected))
+
+
+def _stub_platform_scraper(stub_server, platform, delay):
+    import requests
+
+    def scrape(handle):
+        response = requests.get(stub_server.url(f'/{platform}/{handle}', delay=delay), timeout=5)
+        return {'platform': platform, 'username': handle, 'profile_data': response.json(),
+                'scraping_status': 'completed'}
+    return scrape
+
+
+def test_concurrent_scraping_preserves_platform_order(stub_server):
+    import time
+    from app.services.scraping.social_media_scraper import SocialMediaScraper
+
+    scraper = SocialMediaScraper()
+    delays = {'linkedin': 0.4, 'twitter': 0.1, 'facebook': 0.3, 'instagram': 0.2}
+    for platform, delay in delays.items():
+        scraper.platform_scrapers[platform] = _stub_platform_scraper(stub_server, platform, delay)
+
+    handles = dict(linkedin_url='ana', twitter_username='ana', facebook_url='ana', instagram_username='ana')
+
+    started = time.monotonic()
+    results = scraper.scrape_candidate_profiles(**handles, concurrent=True)
+    elapsed = time.monotonic() - started
+
+    assert [r['platform'] for r in results] == ['linkedin', 'twitter', 'facebook', 'instagram']
+    # Serial would take the sum (1.0s); concurrent is bounded by the slowest platform
+    assert elapsed < sum(delays.values()) - 0.3
+
+
+def test_concurrent_scraping_platform_timeout(stub_server):
+    import time
+    from app.services.scraping.social_media_scraper import SocialMediaScraper
+
+    scraper = SocialMediaScraper()
+    scraper.platform_timeout = 0.5
+    scraper.total_deadline = 5
+    scraper.platform_scrapers['linkedin'] = _stub_platform_scraper(stub_server, 'linkedin', 2)
+    scraper.platform_scrapers['twitter'] = _stub_platform_scraper(stub_server, 'twitter', 0.1)
+
+    started = time.monotonic()
+    results = scraper.scrape_candidate_profiles(
+        linkedin_url='https://linkedin.com/in/ana', twitter_username='@ana', concurrent=True
+    )
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 1.5
+    assert results[0]['platform'] == 'linkedin'
+    assert results[0]['scraping_status'] == 'timeout'
+    assert results[0]['profile_url'] == 'https://linkedin.com/in/ana'
+    assert results[1]['scraping_status'] == 'completed'
+
+
+def test_scraper_session_retries_and_decompresses(stub_server):
+    from app.services.scraping.http_session import build_session
+
+    session = build_session()
+    session.get_adapter('http://').max_retries.backoff_factor = 0
+
+    response = session.get(stub_server.url('/twitter/ana', fail=2, status=429), timeout=5)
+    assert response.status_code == 200
+    assert response.json()['attempt'] == 3
+
+    response = session.get(stub_server.url('/linkedin/ana', gzip=1), timeout=5)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.json()['path'] == '/linkedin/ana'
+
+
+def test_scraper_shares_pooled_session(stub_server):
+    from app.services.scraping.social_media_scraper import SocialMediaScraper
+
+    first, second = SocialMediaScraper(), SocialMediaScraper()
+    assert first.session is second.session
+
+    for scraper in (first, second, first):
+        assert scraper.fetch(stub_server.url('/facebook/ana')).status_code == 200
+    assert len(stub_server.connections) == 1
+
+
+def test_async_scraper_bounds_concurrency():
+    import asyncio
+    from app.services.scraping.async_social_media_scraper import AsyncSocialMediaScraper
+
+    async def run():
+        scraper = AsyncSocialMediaScraper()
+        scraper._global_limit = asyncio.Semaphore(3)
+        scraper._platform_limits['twitter'] = asyncio.Semaphore(1)
+        in_flight = {'total': 0, 'twitter': 0, 'max_total': 0, 'max_twitter': 0}
+
+        def stub(platform):
+            async def scrape(handle):
+                in_flight['total'] += 1
+                in_flight[platform] = in_flight.get(platform, 0) + 1
+                in_flight['max_total'] = max(in_flight['max_total'], in_flight['total'])
+                in_flight['max_twitter'] = max(in_flight['max_twitter'], in_flight['twitter'])
+                try:
+                    await asyncio.sleep(0.05)
+                    return {'platform': platform, 'username': handle, 'scraping_status': 'completed'}
+                finally:
+                    in_flight['total'] -= 1
+                    in_flight[platform] -= 1
+            return scrape
+
+        for platform in scraper.platform_scrapers:
+            scraper.platform_scrapers[platform] = stub(platform)
+
+        batches = await asyncio.gather(*[
+            scraper.scrape_candidate_profiles(
+                linkedin_url=f'c{i}', twitter_username=f'c{i}',
+                facebook_url=f'c{i}', instagram_username=f'c{i}'
+            )
+            for i in range(4)
+        ])
+        return batches, in_flight
+
+    batches, in_flight = asyncio.run(run())
+
+    assert all([r['platform'] for r in b] == ['linkedin', 'twitter', 'facebook', 'instagram'] for b in batches)
+    assert all(r['scraping_status'] == 'completed' for b in batches for r in b)
+    assert in_flight['max_total'] == 3
+    assert in_flight['max_twitter'] == 1
+
+
+def test_async_scraper_matches_sync_schema():
+    import asyncio
+    from app.services.scraping.async_social_media_scraper import AsyncSocialMediaScraper
+    from app.services.scraping.social_media_scraper import SocialMediaScraper
+
+    handles = dict(linkedin_url='https://linkedin.com/in/ana', twitter_username='ana',
+                   facebook_url='https://facebook.com/ana', instagram_username='ana')
+
+    async def run():
+        scraper = AsyncSocialMediaScraper()
+        scraper.platform_timeout = 0.05
+
+        async def hang(handle):
+            await asyncio.sleep(1)
+        scraper.platform_scrapers['instagram'] = hang
+        return await scraper.scrape_candidate_profiles(**handles)
+
+    async_results = asyncio.run(run())
+    sync_results = SocialMediaScraper().scrape_candidate_profiles(**handles)
+
+    assert [r['platform'] for r in async_results] == [r['platform'] for r in sync_results]
+    for async_result, sync_result in zip(async_results[:3], sync_results[:3]):
+        assert async_result.keys() == sync_result.keys()
+    assert async_results[3]['scraping_status'] == 'timeout'
+
+
+def test_async_scraper_overlaps_sync_platform_scrapers():
+    import asyncio
+    import threading
+    import time
+    from app.services.scraping.async_social_media_scraper import AsyncSocialMediaScraper
+
+    lock = threading.Lock()
+    state = {'in_flight': 0, 'max_in_flight': 0}
+
+    def blocking_scrape(handle):
+        with lock:
+            state['in_flight'] += 1
+            state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+        time.sleep(0.2)
+        with lock:
+            state['in_flight'] -= 1
+        return {'username': handle, 'scraping_status': 'completed'}
+
+    async def run():
+        scraper = AsyncSocialMediaScraper()
+        for platform in scraper.platform_scrapers:
+            scraper.platform_scrapers[platform] = scraper._wrap_sync(blocking_scrape)
+
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        beat = asyncio.ensure_future(heartbeat())
+        start = time.perf_counter()
+        results = await scraper.scrape_candidate_profiles(
+            linkedin_url='ana', twitter_username='ana', facebook_url='ana', instagram_username='ana'
+        )
+        elapsed = time.perf_counter() - start
+        beat.cancel()
+        return results, elapsed, ticks
+
+    results, elapsed, ticks = asyncio.run(run())
+    assert len(results) == 4
+    assert state['max_in_flight'] == 4
+    assert elapsed < 0.6
+    # The loop kept running while the scrapers blocked
+    assert ticks >= 5
+
+
+def _take_tokens(path, attempts):
+    from app.services.scraping.rate_limiter import RateLimiter, SQLiteBucketStore
+
+    limiter = RateLimiter({'twitter': 1}, burst=5, store=SQLiteBucketStore(path))
+    return sum(1 for _ in range(attempts) if limiter.try_acquire('twitter') == 0)
+
+
+def test_rate_limiter_token_bucket(tmp_path):
+    from app.services.scraping.rate_limiter import RateLimiter, RateLimitTimeout, SQLiteBucketStore
+
+    limiter = RateLimiter({'twitter': 600}, burst=2, store=SQLiteBucketStore(str(tmp_path / 'rl.db')))
+
+    assert limiter.try_acquire('twitter') == 0
+    assert limiter.try_acquire('twitter') == 0
+    wait = limiter.expected_wait('twitter')
+    assert 0 < wait <= 0.1
+    # Peeking does not spend tokens
+    assert limiter.expected_wait('twitter') <= wait
+    assert limiter.try_acquire('instagram') == 0
+
+    limiter.acquire('twitter', timeout=1)
+    with pytest.raises(RateLimitTimeout):
+        RateLimiter({'twitter': 1}, burst=1, store=limiter.store).acquire('twitter', timeout=0.5)
+
+
+def test_rate_limiter_async_keeps_loop_running():
+    import asyncio
+    import time
+    from app.services.scraping.rate_limiter import RateLimiter
+
+    class SlowStore:
+        def take(self, name, rate, capacity, consume):
+            # Stands in for a contended SQLite lock or a slow Redis round trip
+            time.sleep(0.2)
+            return 0.0
+
+    limiter = RateLimiter({'twitter': 60}, burst=1, store=SlowStore())
+
+    async def run():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        beat = asyncio.ensure_future(heartbeat())
+        await asyncio.gather(*(limiter.acquire_async('twitter') for _ in range(3)))
+        beat.cancel()
+        return ticks
+
+    assert asyncio.run(run()) >= 5
+
+
+def test_redis_url_without_client_warns(monkeypatch, caplog):
+    import sys
+    from app.core import redis as redis_module
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, 'REDIS_URL', 'redis://localhost:6379/0')
+    monkeypatch.setitem(sys.modules, 'redis', None)
+    monkeypatch.setattr(redis_module, '_client_pid', None)
+    with caplog.at_level('WARNING', logger='app.core.redis'):
+        assert redis_module.get_redis() is None
+    assert 'redis package is not installed' in caplog.text
+
+
+def test_rate_limiter_shared_across_processes(tmp_path):
+    from concurrent.futures import ProcessPoolExecutor
+
+    path = str(tmp_path / 'rl.db')
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        granted = sum(executor.map(_take_tokens, [path] * 4, [5] * 4))
+    # Four workers, one bucket: only the burst gets through
+    assert granted == 5
+
+
+def test_serial_scraping_runs_throttled_platform_last(tmp_path):
+    from app.services.scraping.rate_limiter import RateLimiter, SQLiteBucketStore
+    from app.services.scraping.social_media_scraper import SocialMediaScraper
+
+    scraper = SocialMediaScraper()
+    scraper.rate_limiter = RateLimiter({'linkedin': 1}, burst=1, store=SQLiteBucketStore(str(tmp_path / 'rl.db')))
+    scraper.rate_limiter.try_acquire('linkedin')
+
+    calls = []
+    for platform in scraper.platform_scrapers:
+        scraper.platform_scrapers[platform] = lambda handle, platform=platform: calls.append(platform) or {'platform': platform}
+
+    results = scraper.scrape_candidate_profiles(linkedin_url='ana', twitter_username='ana', concurrent=False)
+    assert calls == ['twitter', 'linkedin']
+    assert [r['platform'] for r in results] == ['linkedin', 'twitter']
+
+
+def test_sentiment_aggregator_matches_batch_aggregate():
+    from app.services.ai.sentiment_aggregator import SentimentAggregator
+    from app.services.ai.sentiment_analyzer import SentimentAnalyzer
+
+    analyzer = SentimentAnalyzer()
+    analyses = analyzer.analyze_posts([
+        'Melayani masyarakat dengan integritas dan profesionalisme',
+        'Layanan ini buruk sekali, sangat kecewa!!!',
+        'Great teamwork on the public service project',
+        'KLIK SEKARANG http://promo.example PROMO GRATIS',
+    ])
+
+    first = SentimentAggregator(analyzer.version).add(analyses[:2])
+    rest = SentimentAggregator.from_state(SentimentAggregator(analyzer.version).add(analyses[2:]).to_state())
+    merged = first.merge(rest)
+
+    expected = analyzer.calculate_aggregate_sentiment(analyses)
+    actual = merged.sentiment_data()
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        assert actual[key] == (pytest.approx(value) if isinstance(value, float) else value)
+    assert SentimentAggregator().sentiment_data() == analyzer.calculate_aggregate_sentiment([])
+
+    engine = ScoringEngine()
+    assert merged.content_totals()['keyword_freq'] == engine._aggregate_keywords(analyses)['freq']
+
+
+def test_paginate_timeline_stops_at_high_water_mark():
+    from app.services.scraping.incremental import high_water_mark, merge_posts, paginate_timeline
+
+    stored = [{'text': 'b', 'date': '2024-01-02'}, {'text': 'a', 'date': '2024-01-01'}]
+    pages = [[{'text': 'd', 'date': '2024-01-03'}, {'text': 'c', 'date': '2024-01-02'}], stored[:1], stored[1:]]
+    requested = []
+
+    def fetch_page(page):
+        requested.append(page)
+        return pages[page] if page < len(pages) else []
+
+    new_posts = paginate_timeline(fetch_page, high_water_mark(stored), max_pages=10)
+    assert [p['text'] for p in new_posts] == ['d', 'c']
+    assert requested == [0, 1]
+
+    merged, added = merge_posts(new_posts + stored[:1], stored)
+    assert [p['text'] for p in merged] == ['d', 'c', 'b', 'a']
+    assert added == new_posts
+
+
+def test_nlp_resources_offline_check_and_provisioning(tmp_path, monkeypatch):
+    import os
+    import nltk
+    from app.core.config import settings
+    from app.services.ai import nlp_resources
+
+    downloads = []
+
+    def fake_download(package, download_dir=None, quiet=False):
+        downloads.append(package)
+        os.makedirs(os.path.join(download_dir, 'tokenizers', package), exist_ok=True)
+        return True
+
+    monkeypatch.setattr(nltk, 'download', fake_download)
+    monkeypatch.setattr(settings, 'NLTK_DATA_DIR', str(tmp_path / 'nltk_data'))
+    monkeypatch.setattr(settings, 'NLTK_RESOURCES', ['tokenizers/vendored_only'])
+
+    report = nlp_resources.check_resources()
+    assert report['status'] == 'missing' and report['missing'] == ['tokenizers/vendored_only']
+    assert downloads == []
+
+    monkeypatch.setattr(settings, 'NLP_OFFLINE', True)
+    with pytest.raises(nlp_resources.MissingNLPResources):
+        nlp_resources.ensure_resources()
+    assert downloads == []
+
+    assert nlp_resources.provision() == []
+    assert downloads == ['vendored_only']
+    assert nlp_resources.check_resources()['status'] == 'ok'
+    nlp_resources.ensure_resources()
+
+
+def test_nlp_resources_failed_download_is_remembered(tmp_path, monkeypatch):
+    import nltk
+    from app.core.config import settings
+    from app.services.ai import nlp_resources
+    from app.services.ai.sentiment_backends import TextBlobBackend
+
+    downloads = []
+    monkeypatch.setattr(nltk, 'download', lambda package, **kwargs: downloads.append(package) or False)
+    monkeypatch.setattr(settings, 'NLTK_DATA_DIR', str(tmp_path / 'nltk_data'))
+    monkeypatch.setattr(settings, 'NLP_OFFLINE', False)
+    monkeypatch.setattr(settings, 'NLTK_RESOURCES', [])
+
+    # The pattern lexicon needs no NLTK data, so nothing is checked or downloaded
+    backend = TextBlobBackend()
+    assert backend.required_resources() == []
+    assert backend.score(['good']) and downloads == []
+
+    for _ in range(3):
+        with pytest.raises(nlp_resources.MissingNLPResources):
+            nlp_resources.ensure_resources(['tokenizers/unreachable'])
+    assert downloads == ['unreachable']
+
+
+def test_batch_by_tokens_respects_budget():
+    from app.services.ai.sentiment_backends import batch_by_tokens
+
+    lengths = [120, 5, 64, 7, 128, 30, 6, 90, 128, 12]
+    batches = batch_by_tokens(lengths, max_tokens=256, max_batch_size=4)
+
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+    for batch in batches:
+        assert len(batch) <= 4
+        assert max(lengths[i] for i in batch) * len(batch) <= 256
+    # Length-sorted, so short posts are not padded to the longest one
+    assert batches[0] == [1, 6, 3, 9]
+
+
+def test_pluggable_sentiment_backend(monkeypatch):
+    from app.services.ai import sentiment_backends
+
+    calls = []
+
+    class FakeBatchedBackend(sentiment_backends.SentimentBackend):
+        name = 'fake'
+        batched = True
+
+        def score(self, texts):
+            calls.append(list(texts))
+            return [(-0.8 if 'kecewa' in text else 0.9, 0.75) for text in texts]
+
+    monkeypatch.setitem(sentiment_backends.SENTIMENT_BACKENDS, 'fake', FakeBatchedBackend)
+    analyzer = SentimentAnalyzer()
+    default_version = analyzer.version
+    analyzer.backend = 'fake'
+    assert analyzer.version != default_version
+
+    texts = ['Pelayanan memuaskan', 'Saya kecewa sekali', 'Rapat koordinasi']
+    results = analyzer.analyze_posts(texts)
+    assert calls == [texts]
+    assert [r.sentiment_label for r in results] == ['positive', 'negative', 'positive']
+    assert results[1].confidence == 0.75
+
+    # Cached per backend: a second pass scores nothing new
+    analyzer.analyze_posts(texts)
+    assert len(calls) == 1
+
+    with pytest.raises(ValueError):
+        sentiment_backends.get_sentiment_backend('missing')
+
+
+def test_job_processes_split_analyzer_workers(monkeypatch):
+    import os
+    from app.core.config import settings
+    from app.services import job_queue
+    from app.services.container import ServiceContainer
+
+    monkeypatch.setattr(os, 'cpu_count', lambda: 8)
+    monkeypatch.setattr(settings, 'ANALYZER_WORKERS', 0)
+    assert job_queue.job_analyzer_workers(4) == 2
+    assert job_queue.job_analyzer_workers(16) == 1
+    monkeypatch.setattr(settings, 'ANALYZER_WORKERS', 3)
+    assert job_queue.job_analyzer_workers(4) == 3
+
+    container = ServiceContainer(analyzer_workers=2)
+    assert container.sentiment_analyzer.batch_workers == 2
+    container.close()